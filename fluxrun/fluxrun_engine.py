@@ -1,9 +1,13 @@
 import os
-import subprocess
+import shutil
+import sqlite3
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from .ops import file, logger, setup, vis
+# vis (and with it matplotlib) is imported only where plots are created
+from .ops import cache, database, eddypro, file, logger, setup, stats
 from .settings import version
 
 
@@ -16,6 +20,17 @@ class FluxRunEngine:
         self.settings = settings
         self.logger = None
 
+        # Folder listings, run folders are only indexed in memory
+        self.rawdata_file_index = None
+        self.run_file_index = cache.DirectoryIndex()
+
+        # Raw data files as found in INDIR (e.g. .gz files) and as used for processing
+        self.rawdata_source_files_dict = {}
+        self.rawdata_found_files_dict = {}
+
+        # Incremental mode, raw data files that were already processed
+        self.processed_files_state = None
+
         # Set filepath to setting YAML
         dir_script = os.path.abspath(__file__)  # Dir of this file
         dir_settings = Path(
@@ -86,68 +101,255 @@ class FluxRunEngine:
             file.SearchAll(settings=self.settings,
                            logger=self.logger,
                            search_in_dir=self.settings['_dir_used_rawdata_ascii_files_eddypro_data_path'],
-                           search_uncompressed=True).keep_valid_files()
+                           search_uncompressed=True,
+                           file_index=self.run_file_index).keep_valid_files()
         return rawdata_found_files_dict
 
     def _run_rawdata(self):
+        # Persistent index of the raw data folders, unchanged folders are not listed again
+        if int(self.settings['RAWDATA'].get('FILE_INDEX', 0)) == 1:
+            self.rawdata_file_index = cache.DirectoryIndex(
+                filepath=Path(self.settings['_dir_cache']) / 'rawdata_file_index.json')
+
         # Search valid raw ASCII files
         self.rawdata_found_files_dict = file.SearchAll(
             settings=self.settings,
             logger=self.logger,
-            search_in_dir=self.settings['RAWDATA']['INDIR']) \
+            search_in_dir=self.settings['RAWDATA']['INDIR'],
+            file_index=self.rawdata_file_index) \
             .keep_valid_files()
 
         if not self.rawdata_found_files_dict:
             self.logger.error("NO RAW DATA FILES FOUND. PLEASE CHECK SETTINGS.")
             sys.exit(-1)
 
-        # Uncompress if needed
+        # Incremental mode, only files that were not processed before (or changed since)
+        # are unzipped, validated and processed
+        if self.settings['FLUX_PROCESSING']['RUN_FLUX_CALCS'] == 1 \
+                and int(self.settings['FLUX_PROCESSING'].get('INCREMENTAL', 0)) == 1:
+            self.processed_files_state = cache.ProcessedFilesState(
+                filepath=Path(self.settings['_dir_cache']) / 'processed_files.json')
+            # Files are identified by their uncompressed filename and the file in INDIR
+            pending = self.processed_files_state.pending(
+                found_files={name.removesuffix('.gz'): filepath
+                             for name, filepath in self.rawdata_found_files_dict.items()})
+            self.logger.info(f"[INCREMENTAL] {len(pending)} of {len(self.rawdata_found_files_dict)} raw data files "
+                             f"are new or changed and will be processed.")
+            self.rawdata_found_files_dict = {name: filepath for name, filepath in self.rawdata_found_files_dict.items()
+                                             if name.removesuffix('.gz') in pending}
+            if not pending:
+                return
+        self.rawdata_source_files_dict = self.rawdata_found_files_dict
+
+        # Uncompress if needed, only if EddyPro needs the uncompressed files. Without
+        # flux calculations the .gz files are read directly, nothing is written to disk.
+        rawdata_file_datefrmt = self.settings['_sitefiles_parse_str_python_uncompr'].rstrip('.gz')
         if Path(self.settings['_sitefiles_parse_str_python']).suffix == '.gz':
-            self.rawdata_found_files_dict = self._run_rawdata_uncompress()
+            if self.settings['FLUX_PROCESSING']['RUN_FLUX_CALCS'] == 1:
+                self.rawdata_found_files_dict = self._run_rawdata_uncompress()
+                if int(self.settings['RAWDATA'].get('UNCOMPRESSED_CACHE', 0)) == 1:
+                    self._evict_uncompressed_cache()
+            else:
+                self.logger.info("No flux calculations selected, .gz raw data files are read directly "
+                                 "without unzipping them to the run folder.")
+                rawdata_file_datefrmt = self.settings['_sitefiles_parse_str_python']
 
-        # Availability heatmap for *uncompressed* raw data files
+        # Availability heatmap for raw data files, sizes of uncompressed data
         if self.settings['RAWDATA']['PLOT_RAWDATA_AVAILABILITY'] == 1:
+            from .ops import vis
             vis.availability_rawdata(
                 rawdata_found_files_dict=self.rawdata_found_files_dict,
-                rawdata_file_datefrmt=self.settings['_sitefiles_parse_str_python_uncompr'].rstrip('.gz'),
+                rawdata_file_datefrmt=rawdata_file_datefrmt,
                 outdir=self.settings['_dir_out_run_plots_availability_rawdata'],
                 logger=self.logger)
 
+        # Aggregates for raw data files are collected while the
+        # files are validated, so each file is read only once
+        aggregates = None
+        if self.settings['RAWDATA']['PLOT_RAWDATA_AGGREGATES'] == 1:
+            from .ops import vis
+            aggregates = vis.PlotRawDataFilesAggregates(
+                rawdata_found_files_dict=self.rawdata_found_files_dict,
+                settings_dict=self.settings,
+                logger=self.logger,
+                rawdata_file_datefrmt=rawdata_file_datefrmt,
+                collect=False)
+
         # Make sure all raw data are numeric
         file.validate_numeric_data(
             settings=self.settings,
             found_files=self.rawdata_found_files_dict,
-            logger=self.logger
+            logger=self.logger,
+            aggregates=aggregates
         )
 
-        # todo move? Plot stats for *uncompressed* raw data files
-        if self.settings['RAWDATA']['PLOT_RAWDATA_AGGREGATES'] == 1:
-            vis.PlotRawDataFilesAggregates(
-                rawdata_found_files_dict=self.rawdata_found_files_dict,
-                settings_dict=self.settings,
-                logger=self.logger,
-                rawdata_file_datefrmt=self.settings['_sitefiles_parse_str_python_uncompr'].rstrip('.gz'))
+        if aggregates is not None:
+            aggregates.plot()
+
+        # Limit size of cached parsed raw data files
+        if int(self.settings['RAWDATA'].get('PARSED_CACHE', 0)) == 1:
+            num_evicted = cache.ParsedFileCache(dirpath=Path(self.settings['_dir_cache']) / 'parsed').evict(
+                max_bytes=int(self.settings['RAWDATA'].get('PARSED_CACHE_MAX_MB', 10240)) * 1024 ** 2)
+            self.logger.info(f"Parsed raw data cache: removed {num_evicted} least recently used files.")
 
     def _run_fluxprocessing(self):
+        # Incremental mode, only new or changed files were found (see _run_rawdata)
+        files = self.rawdata_found_files_dict
+        incremental = self.processed_files_state is not None
+
+        # Number of time windows that are processed by parallel EddyPro runs
+        num_chunks = setup.get_num_workers(self.settings['FLUX_PROCESSING'].get('EDDYPRO_CHUNKS', 1))
+        num_chunks = min(num_chunks, len(files))
+        if num_chunks <= 1 and not incremental:
+            self._run_eddypro(settings=self.settings)
+            return
+
+        # Files are staged in chunk folders, in incremental mode also if there is only one chunk
+        processed_files, filepath_full_output = self._run_fluxprocessing_chunks(files=files, num_chunks=num_chunks)
+        if not incremental or not filepath_full_output:
+            return
+
+        # Append results to the master full_output file, then remember the processed files
+        filepath_master = Path(self.settings['OUTPUT']['OUTDIR']) / \
+            f"{self.settings['OUTPUT']['OUTDIR_PREFIX']}_full_output_master.csv"
+        try:
+            num_new, num_replaced = eddypro.update_master_full_output(master=filepath_master,
+                                                                      new=filepath_full_output)
+        except ValueError as e:
+            self.logger.error(f"[INCREMENTAL] MASTER FULL_OUTPUT FILE WAS NOT UPDATED: {e}")
+            return
+        self.logger.info(f"[INCREMENTAL] Master full_output file {filepath_master}: "
+                         f"{num_new} records added, {num_replaced} records replaced.")
+        # Files are identified by the files in INDIR, uncompressed files are new in every run
+        sources = {name.removesuffix('.gz'): filepath for name, filepath in self.rawdata_source_files_dict.items()}
+        self.processed_files_state.mark_processed(files={name: sources[name] for name in processed_files},
+                                                  run_id=self.settings['_run_id'])
+        self.processed_files_state.save()
+
+    def _run_eddypro(self, settings: dict, log_prefix: str = '[EDDYPRO LOG]') -> int:
+        """Run EddyPro RP and, if needed, FCC with the files prepared in settings, returns the return code"""
         # Call EddyPro processing
-        rp_process_status = self.run_eddypro_cmd(cmd='eddypro_rp.exe')  # execute exe
+        process_status = self.run_eddypro_cmd(executable=settings['_path_used_eddypro_app_rp'],
+                                              log_prefix=log_prefix)  # execute exe
 
         # Check if EddyPro full_output file was already generated
         found_full_output, _ = file.check_if_file_in_folder(search_str='*_full_output_*.csv',
-                                                            folder=self.settings[
-                                                                '_dir_out_run_eddypro_results'])
+                                                            folder=settings['_dir_out_run_eddypro_results'])
         if found_full_output:
-            self.logger.warning("EDDYPRO RP ALREADY GENERATED A FULL_OUTPUT FILE. "
+            self.logger.warning(f"{log_prefix} EDDYPRO RP ALREADY GENERATED A FULL_OUTPUT FILE. "
                                 "FCC WILL BE SKIPPED.")
             self.logger.warning("RP = Raw data processing, FCC = flux computation and correction")
             self.logger.warning("This is not necessarily an error. If the spectral correction "
                                 "is purely analytical (or no spectral correction is applied), "
                                 "then FCC is not executed.")
 
-        if rp_process_status == 0 and found_full_output is False:
-            fcc_process_status = self.run_eddypro_cmd(cmd='eddypro_fcc.exe')  # execute exe
+        if process_status == 0 and found_full_output is False:
+            process_status = self.run_eddypro_cmd(executable=settings['_path_used_eddypro_app_fcc'],
+                                                  log_prefix=log_prefix)  # execute exe
+        return process_status
+
+    def _prepare_eddypro_chunk(self, chunk_id: int, files: dict) -> dict:
+        """Settings for an EddyPro run on one time window.
+
+        The chunk folder has its own ini, bin, results and data folders, the raw
+        data files of the window are linked (or copied) to the data folder.
+        """
+        dir_chunk = Path(self.settings['_dir_out_run_eddypro']) / 'chunks' / f"chunk_{chunk_id:02d}"
+        settings = dict(self.settings)
+        settings['_dir_out_run_eddypro_ini'] = dir_chunk / 'ini'
+        settings['_dir_out_run_eddypro_bin'] = dir_chunk / 'bin'
+        settings['_dir_out_run_eddypro_results'] = dir_chunk / 'results'
+        settings['_dir_used_rawdata_ascii_files_eddypro_data_path'] = dir_chunk / 'data'
+        for subdir in ['ini', 'bin', 'results', 'data']:
+            (dir_chunk / subdir).mkdir(parents=True, exist_ok=True)
+        for filename, filepath in files.items():
+            file.stage_file(src=filepath, dst=dir_chunk / 'data' / filename)
+        return file.PrepareEddyProFiles(settings_dict=settings, logger=self.logger).get()
+
+    def _run_fluxprocessing_chunks(self, files: dict, num_chunks: int) -> tuple:
+        """Run EddyPro in parallel on contiguous time windows and merge the full_output files.
+
+        Each window is processed independently, e.g. planar fit or time lag
+        optimization only use the data of their window.
+
+        Returns:
+            Dict of the files (filename and filepath) of windows that were processed
+            successfully, and the path of the merged full_output file (None if no
+            full_output file was merged).
+        """
+        matcher = file.FilenameMatcher(self.settings['_sitefiles_parse_str_python_uncompr'])
+        filedates = {name: matcher.parse(name) for name in files}
+        windows = eddypro.split_into_windows(found_files=files, filedates=filedates, num_windows=num_chunks)
+
+        chunk_settings, log_prefixes = [], []
+        for chunk_id, window_files in enumerate(windows, start=1):
+            names = list(window_files)
+            self.logger.info(f"[EDDYPRO CHUNKS] Chunk {chunk_id}/{len(windows)}: {len(window_files)} files, "
+                             f"{names[0]} ... {names[-1]}")
+            chunk_settings.append(self._prepare_eddypro_chunk(chunk_id=chunk_id, files=window_files))
+            log_prefixes.append(f"[EDDYPRO LOG] [chunk {chunk_id}/{len(windows)}]")
+
+        tic = time.time()
+        with ThreadPoolExecutor(max_workers=len(chunk_settings)) as executor:
+            process_statuses = list(executor.map(self._run_eddypro, chunk_settings, log_prefixes))
+        self.logger.info(f"[EDDYPRO CHUNKS] {len(chunk_settings)} chunks finished in {time.time() - tic:.1f}s, "
+                         f"return codes: {process_statuses}")
+
+        # Linked raw data files are not needed anymore
+        for settings in chunk_settings:
+            shutil.rmtree(settings['_dir_used_rawdata_ascii_files_eddypro_data_path'], ignore_errors=True)
+
+        # Merge full_output files in time order
+        full_output_files = []
+        processed_files = {}
+        for chunk_id, (settings, window_files, process_status) in \
+                enumerate(zip(chunk_settings, windows, process_statuses), start=1):
+            found_full_output, filepath_full_output = \
+                file.check_if_file_in_folder(search_str='*_full_output_*.csv',
+                                             folder=settings['_dir_out_run_eddypro_results'])
+            if found_full_output:
+                full_output_files.append(filepath_full_output)
+                if process_status == 0:
+                    processed_files.update(window_files)
+            else:
+                self.logger.warning(f"[EDDYPRO CHUNKS] NO *_full_output_* FILE WAS FOUND FOR CHUNK {chunk_id}.")
+        if not full_output_files:
+            return processed_files, None
+        outfile = Path(self.settings['_dir_out_run_eddypro_results']) / Path(full_output_files[0]).name
+        try:
+            num_records = eddypro.merge_full_output_files(filepaths=full_output_files, outfile=outfile)
+        except ValueError as e:
+            self.logger.error(f"[EDDYPRO CHUNKS] FULL_OUTPUT FILES COULD NOT BE MERGED: {e}")
+            return processed_files, None
+        self.logger.info(f"[EDDYPRO CHUNKS] Merged {len(full_output_files)} full_output files "
+                         f"({num_records} records) to {outfile}")
+        return processed_files, outfile
+
+    def _update_flux_database(self):
+        """Add the full_output records of this run to the site-level flux database"""
+        if int(self.settings['OUTPUT'].get('FLUX_DATABASE', 0)) != 1:
+            return
+        found_full_output, filepath_full_output = \
+            file.check_if_file_in_folder(search_str='*_full_output_*.csv',
+                                         folder=self.settings['_dir_out_run_eddypro_results'])
+        if not found_full_output:
+            self.logger.warning("FLUX DATABASE NOT UPDATED BECAUSE NO *_full_output_* FILE WAS FOUND.")
+            return
+        # Read with float64, lean dtypes (OUTPUT: LEAN_DTYPES) are only used for plots
+        data_df = file.ReadEddyProFullOutputFile(filepath=filepath_full_output, lean_dtypes=False).get()
+        filepath_db = Path(self.settings['OUTPUT']['OUTDIR']) \
+                      / f"{self.settings['OUTPUT']['OUTDIR_PREFIX']}_fluxes.sqlite"
+        try:
+            flux_db = database.FluxDatabase(filepath=filepath_db)
+            num_added, num_replaced = flux_db.upsert(df=data_df, run_id=self.settings['_run_id'])
+            flux_db.close()
+        except sqlite3.Error as e:
+            self.logger.error(f"[FLUX DATABASE] {filepath_db} COULD NOT BE UPDATED: {e}")
+            return
+        self.logger.info(f"[FLUX DATABASE] {filepath_db}: {num_added} records added, {num_replaced} records replaced.")
 
     def _run_output(self):
+        self._save_summary_stats()
         self._plot_summary()
 
     # def _run_afterprocessing(self):
@@ -164,8 +366,13 @@ class FluxRunEngine:
         self._run_setup()
         self._run_rawdata()
         if self.settings['FLUX_PROCESSING']['RUN_FLUX_CALCS'] == 1:
-            self._run_fluxprocessing()
-            self._run_output()
+            if self.processed_files_state is not None and not self.rawdata_source_files_dict:
+                self.logger.info("[INCREMENTAL] No new or changed raw data files, "
+                                 "flux calculations and output are skipped.")
+            else:
+                self._run_fluxprocessing()
+                self._update_flux_database()
+                self._run_output()
         if int(self.settings['AFTER PROCESSING']['DELETE_UNCOMPRESSED_ASCII_AFTER_PROCESSING']) == 1:
             self._delete_uncompressed_ascii_files()
         self._run_finalize()
@@ -177,87 +384,101 @@ class FluxRunEngine:
                                          folder=self.settings['_dir_out_run_eddypro_results'])
         if found_full_output:
             if int(self.settings['OUTPUT']['PLOT_SUMMARY']) == 1:
+                from .ops import vis
                 vis.PlotEddyProFullOutputFile(
                     file_to_plot=filepath_full_output,
                     destination_folder=self.settings['_dir_out_run_plots_summary'],
-                    logger=self.logger).run()
+                    logger=self.logger,
+                    num_workers=setup.get_num_workers(self.settings['OUTPUT'].get('PLOT_WORKERS', 1)),
+                    lean_dtypes=int(self.settings['OUTPUT'].get('LEAN_DTYPES', 0)) == 1).run()
             else:
                 self.logger.info("Skipping summary plots (not selected).")
         else:
             if int(self.settings['OUTPUT']['PLOT_SUMMARY']) == 1:
                 self.logger.warning("SKIPPING SUMMARY PLOTS BECAUSE NO *_full_output_* FILE WAS FOUND.")
 
+    def _save_summary_stats(self):
+        """Save summary statistics of all columns of the full_output file as one table, without plotting"""
+        if int(self.settings['OUTPUT'].get('SUMMARY_STATS', 0)) != 1:
+            return
+        found_full_output, filepath_full_output = \
+            file.check_if_file_in_folder(search_str='*_full_output_*.csv',
+                                         folder=self.settings['_dir_out_run_eddypro_results'])
+        if not found_full_output:
+            self.logger.warning("SKIPPING SUMMARY STATISTICS BECAUSE NO *_full_output_* FILE WAS FOUND.")
+            return
+        # Read with float64, lean dtypes (OUTPUT: LEAN_DTYPES) are only used for plots
+        data_df = file.ReadEddyProFullOutputFile(filepath=filepath_full_output, lean_dtypes=False).get()
+        stats_df = stats.calc_summary_stats(df=data_df)
+        outfile = Path(self.settings['_dir_out_run_summary_stats']) / f"{self.settings['_run_id']}_summary_stats.csv"
+        stats_df.to_csv(outfile, index=False)
+        self.logger.info(f"Saved summary statistics ({len(stats_df)} rows) to {outfile}")
+
     def _delete_uncompressed_ascii_files(self):
-        """Delete uncompressed (unzipped) ASCII files that were used for flux processing"""
+        """Delete uncompressed (unzipped) ASCII files that were used for flux processing
+
+        All uncompressed files in the run folder are deleted. Files in the cache of
+        uncompressed files (RAWDATA: UNCOMPRESSED_CACHE) are kept until they are
+        evicted, see _evict_uncompressed_cache().
+        """
         uncompressed_ascii_files = file.SearchAll(
             settings=self.settings,
             logger=self.logger,
             search_in_dir=self.settings['_dir_out_run_rawdata_ascii_files'],
-            search_uncompressed=True) \
+            search_uncompressed=True,
+            file_index=self.run_file_index) \
             .keep_valid_files()
 
-        # Convert to list
-        deletepaths = []
-        for filename, filepath in uncompressed_ascii_files.items():
-            deletepaths.append(filepath)
-
-        # Keep the last file
-        deletepaths = list(deletepaths)[:-1]
-
         # Make sure there are uncompressed files only, e.g. CSVs, dat etc, depending on input files
-        deletelist = []
         uncompr_suffix = Path(self.settings['_sitefiles_parse_str_python_uncompr']).suffix
-        [deletelist.append(x) for x in deletepaths if x.suffix == uncompr_suffix]
+        deletelist = [filepath for filepath in uncompressed_ascii_files.values() if filepath.suffix == uncompr_suffix]
 
         # Delete files
         for filepath in deletelist:
             self.logger.info(f"Deleting uncompressed (unzipped) ASCII file: {filepath} ...")
             os.remove(filepath)
 
-    def run_eddypro_cmd(self, cmd: str):
-        """Run eddypro_rp.exe or eddypro_fcc.exe"""
-
-        # todo check execution
-        # # ALTERNATIVE, works:
-        # os.chdir(self.settings['_dir_out_run_eddypro_bin'])  # go to eddypro bin folder
-        # process = subprocess.Popen(
-        #     [cmd],
-        #     stdout=subprocess.PIPE,
-        #     stderr=subprocess.PIPE,
-        #     text=True,
-        # )
-        # while True:
-        #     output = process.stdout.readline()
-        #     if output:
-        #         print(output.strip())  # Print the output line
-        #     if process.poll() is not None:
-        #         break
-        # # Capture any remaining output and errors
-        # remaining_stdout, remaining_stderr = process.communicate()
-        # print(remaining_stdout)
-        # print(remaining_stderr)
-
-        os.chdir(self.settings['_dir_out_run_eddypro_bin'])  # go to eddypro bin folder
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)  # call cmd command
-        while process.poll() is None:
-            # This blocks until it receives a newline.
-            line = process.stdout.readline().decode('utf-8').rstrip()
-            # line = process.stdout.readline().decode('utf-8').replace('\r\n', '')
-            if 'processing new flux averaging period' in line:
-                self.logger.info("-" * 60)  # to better see the different days in the output
-            else:
-                self.logger.info(f"[EDDYPRO LOG] [{cmd}] {line}")
-        # When the subprocess terminates there might be unconsumed output that still needs to be processed.
-        self.logger.info(process.stdout.read().decode('utf-8').replace('\r\n', ''))
-        process_status = process.wait()  # Wait for cmd to terminate. Get return returncode
+        # Cached files that are no longer staged in this run folder can be evicted
+        if int(self.settings['RAWDATA'].get('UNCOMPRESSED_CACHE', 0)) == 1:
+            self._evict_uncompressed_cache(released=deletelist)
+
+    def _evict_uncompressed_cache(self, released: list = None):
+        """Limit size of the cache of uncompressed files (RAWDATA: UNCOMPRESSED_CACHE_MAX_MB)
+
+        Least recently used files are removed first, files that are staged in a
+        run folder are kept (reference counting, see cache.StagedFileRefs).
+
+        Args:
+            released: Staged files that were deleted from the run folder.
+        """
+        staged_refs = cache.StagedFileRefs(filepath=Path(self.settings['_dir_cache']) / 'uncompressed_refs.sqlite')
+        staged_refs.release(staged_filepaths=released or [])
+        num_evicted = cache.UncompressedFileCache(dirpath=Path(self.settings['_dir_cache']) / 'uncompressed').evict(
+            max_bytes=int(self.settings['RAWDATA'].get('UNCOMPRESSED_CACHE_MAX_MB', 10240)) * 1024 ** 2,
+            staged_refs=staged_refs)
+        staged_refs.close()
+        self.logger.info(f"Uncompressed raw data cache: removed {num_evicted} least recently used files.")
+
+    def run_eddypro_cmd(self, executable, log_prefix: str = '[EDDYPRO LOG]'):
+        """Run eddypro_rp.exe or eddypro_fcc.exe
+
+        The executable is started with its full path in its bin folder, its output
+        (stdout and stderr) is logged in batches by eddypro.EddyProProcess.
+        """
+        cmd = Path(executable).name
+        process = eddypro.EddyProProcess(executable=executable, cwd=Path(executable).parent,
+                                         logger=self.logger, log_prefix=log_prefix)
+        process_status = process.run()  # Wait for cmd to terminate. Get return returncode
+        self.logger.info(f"{log_prefix} {cmd} output: {process.num_lines} lines, "
+                         f"{process.num_periods} flux averaging periods processed.")
 
         # CHECK IF FINISHED SUCCESSFULLY
         self.logger.info("*" * 30)
-        self.logger.info(f"[EDDYPRO LOG] {cmd} return code: {process_status}")
+        self.logger.info(f"{log_prefix} {cmd} return code: {process_status}")
         if process_status == 0:
-            self.logger.info(f"[EDDYPRO LOG] {cmd} finished successfully.")
+            self.logger.info(f"{log_prefix} {cmd} finished successfully.")
         else:
-            self.logger.info(f"[EDDYPRO LOG] {cmd} ENCOUNTERED A PROBLEM.")
+            self.logger.info(f"{log_prefix} {cmd} ENCOUNTERED A PROBLEM.")
         self.logger.info("*" * 30)
         return process_status
 
@@ -0,0 +1,483 @@
+import contextlib
+import datetime as dt
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def file_signature(filepath) -> tuple:
+    """Size (bytes) and modification time (ns) of a file, used to detect changed files"""
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class AggregatesCache:
+    """Per-file raw data aggregates that are kept across runs in a SQLite file.
+
+    Entries are identified by the filename and are only valid as long as size
+    and modification time of the file did not change. The filename is used
+    instead of the full path because uncompressed .gz files are written to a
+    new run folder in every run (keeping the modification time of the .gz file).
+
+    Besides the aggregates row it is stored whether all data in the file were
+    numeric, unchanged files that were valid do not need to be validated again.
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, filepath, horizon_days: int = None):
+        """
+        Args:
+            filepath: SQLite file, created if it does not exist.
+            horizon_days: Entries for files with a file date older than this
+                number of days are removed, None keeps all entries.
+        """
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.filepath)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS aggregates ("
+            "filename TEXT PRIMARY KEY, filepath TEXT, filesize INTEGER, mtime_ns INTEGER, "
+            "filedate TEXT, header_format TEXT, all_numeric INTEGER, columns TEXT, aggregates BLOB)")
+        self._num_uncommitted = 0
+        self.num_evicted = self.evict(horizon_days=horizon_days) if horizon_days is not None else 0
+
+    def evict(self, horizon_days: int) -> int:
+        """Remove entries of files with file date older than horizon_days, returns number of removed entries"""
+        oldest = dt.datetime.now() - dt.timedelta(days=horizon_days)
+        cursor = self.conn.execute("DELETE FROM aggregates WHERE filedate < ?", (oldest.isoformat(),))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def get(self, filename: str, filepath, header_format: str):
+        """Cached aggregates of a file.
+
+        Returns:
+            Tuple (columns, aggregates row, all_numeric) or None if the file is
+            not in the cache or has changed since it was cached.
+        """
+        filesize, mtime_ns = file_signature(filepath)
+        found = self.conn.execute(
+            "SELECT columns, aggregates, all_numeric FROM aggregates "
+            "WHERE filename = ? AND filesize = ? AND mtime_ns = ? AND header_format = ?",
+            (filename, filesize, mtime_ns, header_format)).fetchone()
+        if not found:
+            return None
+        columns = tuple(tuple(col) for col in json.loads(found[0]))
+        row = np.frombuffer(found[1], dtype=np.float64)
+        return columns, row, bool(found[2])
+
+    def put(self, filename: str, filepath, filedate: dt.datetime, header_format: str,
+            columns: tuple, row: np.ndarray, all_numeric: bool):
+        """Add or replace cached aggregates of a file"""
+        filesize, mtime_ns = file_signature(filepath)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (filename, str(filepath), filesize, mtime_ns, filedate.isoformat(), header_format,
+             int(all_numeric), json.dumps(columns), np.asarray(row, dtype=np.float64).tobytes()))
+        self._num_uncommitted += 1
+        if self._num_uncommitted >= self.COMMIT_EVERY:
+            self.conn.commit()
+            self._num_uncommitted = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class ParsedFileCache:
+    """Parsed raw data files that are kept across runs as pickle files, one per file.
+
+    Each pickle contains the dataframe with its MultiIndex header and dtypes, the
+    warnings that were logged while parsing the file, and the size and modification
+    time of the source file. Entries are identified by the filename (see
+    AggregatesCache) and are only used while size, modification time and header
+    format are unchanged. Reading an entry updates its modification time, evict()
+    then removes the least recently used entries.
+
+    The sizes of the entries are kept in the SQLite file 'sizes.sqlite' in the
+    cache folder, which is shared by all processes that add entries (e.g. the
+    validation workers). put() updates the sizes and evicts while holding the
+    write lock of this file, so max_bytes limits the cache as a whole.
+
+    Entries are loaded with pickle, which can execute code: the cache folder must
+    only be writable by users that are trusted to run code with fluxrun.
+    """
+
+    EVICT_TO_FRACTION = 0.9  # put() evicts to this fraction of max_bytes, so not every put() evicts
+    LOCK_TIMEOUT_SECONDS = 600
+
+    def __init__(self, dirpath, max_bytes: int = None):
+        """
+        Args:
+            dirpath: Cache folder, created when the first entry is added.
+            max_bytes: Maximum size of the cache, enforced while entries are
+                added. None does not limit the size (see evict()).
+        """
+        self.dirpath = Path(dirpath)
+        self.max_bytes = max_bytes
+
+    def _cache_filepath(self, filepath) -> Path:
+        return self.dirpath / f"{Path(filepath).name}.pkl"
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection to the sizes of the entries, transactions are started explicitly"""
+        conn = sqlite3.connect(self.dirpath / 'sizes.sqlite', timeout=self.LOCK_TIMEOUT_SECONDS,
+                               isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS sizes (name TEXT PRIMARY KEY, size INTEGER)")
+        return conn
+
+    def get(self, filepath, header_format: str):
+        """Cached dataframe of a file.
+
+        Returns:
+            Tuple (dataframe, list of warnings) or None if the file is not in the
+            cache or has changed since it was cached.
+        """
+        cache_filepath = self._cache_filepath(filepath)
+        if not cache_filepath.is_file():
+            return None
+        try:
+            with open(cache_filepath, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None  # Unreadable entry, e.g. written by a different pandas version, is replaced
+        if entry['signature'] != file_signature(filepath) or entry['header_format'] != header_format:
+            return None
+        os.utime(cache_filepath)
+        return entry['df'], entry['warnings']
+
+    def put(self, filepath, header_format: str, df, warnings: list):
+        """Add or replace cached dataframe of a file, least recently used entries
+        are removed when the cache gets larger than max_bytes"""
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        cache_filepath = self._cache_filepath(filepath)
+        entry = dict(signature=file_signature(filepath), header_format=header_format, df=df, warnings=warnings)
+        tmp_filepath = cache_filepath.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_filepath, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filepath, cache_filepath)
+        if self.max_bytes is None:
+            return
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT COUNT(*) FROM sizes").fetchone()[0] == 0:
+                self._evict(conn=conn, max_bytes=None)  # Sizes of entries added before sizes were kept
+            try:
+                size = os.path.getsize(cache_filepath)
+            except FileNotFoundError:
+                size = None  # Already evicted by another process
+            if size is not None:
+                conn.execute("INSERT OR REPLACE INTO sizes VALUES (?, ?)", (cache_filepath.name, size))
+            if conn.execute("SELECT COALESCE(SUM(size), 0) FROM sizes").fetchone()[0] > self.max_bytes:
+                self._evict(conn=conn, max_bytes=int(self.max_bytes * self.EVICT_TO_FRACTION))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def evict(self, max_bytes: int = None) -> int:
+        """Remove least recently used entries until the cache is not larger than
+        max_bytes (None removes nothing, only the sizes are updated), returns number
+        of removed entries"""
+        if not self.dirpath.is_dir():
+            return 0
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            num_evicted = self._evict(conn=conn, max_bytes=max_bytes)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return num_evicted
+
+    def _evict(self, conn: sqlite3.Connection, max_bytes: int = None) -> int:
+        """Remove least recently used entries, the sizes are then replaced by the
+        sizes of the remaining entries, conn must hold the write lock"""
+        entries = []
+        for entry in os.scandir(self.dirpath):
+            if entry.is_file() and entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Replaced by another process
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        num_evicted = 0
+        for _, size, path in entries:
+            if max_bytes is None or total_bytes <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Removed by another process
+            total_bytes -= size
+            num_evicted += 1
+        conn.execute("DELETE FROM sizes")
+        conn.executemany("INSERT INTO sizes VALUES (?, ?)",
+                         [(os.path.basename(path), size) for _, size, path in entries[num_evicted:]])
+        return num_evicted
+
+
+class UncompressedFileCache:
+    """Uncompressed .gz raw data files that are kept across runs, one file per .gz file.
+
+    Entries are content-addressed: the name of an entry starts with a hash of
+    path, size and modification time of the .gz file, so a changed .gz file gets
+    a new entry. Entries keep the modification time of their .gz file (see
+    file._uncompress_gz_file), the access time is set when an entry is unzipped
+    or used and evict() removes the least recently used entries. Entries that are staged in
+    a run folder (see StagedFileRefs) are not removed.
+    """
+
+    def __init__(self, dirpath):
+        self.dirpath = Path(dirpath)
+
+    def entry_filepath(self, compr_filepath) -> Path:
+        """Path of the entry for a .gz file, e.g. 3f2a..._SITE_20250601-0000.csv"""
+        filesize, mtime_ns = file_signature(compr_filepath)
+        key = hashlib.sha1(f"{os.path.abspath(compr_filepath)}|{filesize}|{mtime_ns}".encode('utf-8')).hexdigest()
+        return self.dirpath / f"{key[:16]}_{Path(compr_filepath).stem}"
+
+    def get(self, compr_filepath):
+        """Path of the cached uncompressed file or None if the .gz file is not in
+        the cache or has changed since it was cached"""
+        entry_filepath = self.entry_filepath(compr_filepath)
+        if not entry_filepath.is_file():
+            return None
+        self.touch(entry_filepath)
+        return entry_filepath
+
+    @staticmethod
+    def touch(entry_filepath):
+        """Mark entry as used, only the access time is changed"""
+        stat = os.stat(entry_filepath)
+        os.utime(entry_filepath, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def evict(self, max_bytes: int, staged_refs: 'StagedFileRefs') -> int:
+        """Remove least recently used entries that are not staged in a run folder until
+        the cache is not larger than max_bytes, returns number of removed entries.
+        Holds the write lock of staged_refs, runs cannot stage entries meanwhile."""
+        if not self.dirpath.is_dir():
+            return 0
+        num_evicted = 0
+        with staged_refs.lock():
+            entries = []
+            for entry in os.scandir(self.dirpath):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Removed by another process
+                    entries.append((stat.st_atime_ns, stat.st_size, entry.path))
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= max_bytes:
+                    break
+                if staged_refs.num_refs(path) > 0:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Removed by another process
+                total_bytes -= size
+                num_evicted += 1
+        return num_evicted
+
+
+class DirectoryIndex:
+    """Listings of folders (file names, sizes and modification times) that are
+    reused as long as the folder was not modified.
+
+    Adding, removing or renaming a file changes the modification time of its
+    folder, a folder is then listed again. Files that were empty or modified
+    shortly before the folder was listed (and might still have been written)
+    are checked again on every lookup. Listings are kept in memory for repeated
+    searches within a run and, if filepath is given, in a JSON file for later runs.
+    """
+
+    VERSION = 1
+    RECHECK_SECONDS = 3600  # Files modified this long before listing are checked again
+    RACY_SECONDS = 2  # Listings this close to the folder modification time are not reused
+
+    def __init__(self, filepath=None):
+        self.filepath = Path(filepath) if filepath else None
+        self.dirs = {}
+        self.num_listed = 0
+        self.num_lookups = 0
+        if self.filepath and self.filepath.is_file():
+            try:
+                with open(self.filepath, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('version') == self.VERSION:
+                    self.dirs = index['dirs']
+            except (OSError, ValueError, KeyError):
+                self.dirs = {}  # Unreadable index is rebuilt
+
+    def list_dir(self, path) -> tuple:
+        """Files and subfolders in folder path.
+
+        Returns:
+            Dict of file names and file sizes (bytes) and list of subfolder names.
+        """
+        key = os.path.abspath(path)
+        dir_mtime_ns = os.stat(key).st_mtime_ns
+        listing = self.dirs.get(key)
+        recheck_ns = self.RECHECK_SECONDS * 1_000_000_000
+        racy_ns = self.RACY_SECONDS * 1_000_000_000
+
+        if listing and listing['mtime_ns'] == dir_mtime_ns \
+                and listing['listed_ns'] - dir_mtime_ns > racy_ns:
+            self.num_lookups += 1
+            for name, (size, mtime_ns) in listing['files'].items():
+                if size == 0 or listing['listed_ns'] - mtime_ns < recheck_ns:
+                    try:
+                        stat = os.stat(os.path.join(key, name))
+                        listing['files'][name] = [stat.st_size, stat.st_mtime_ns]
+                    except OSError:
+                        pass
+        else:
+            self.num_listed += 1
+            listing = {'mtime_ns': dir_mtime_ns, 'listed_ns': time.time_ns(), 'files': {}, 'subdirs': []}
+            with os.scandir(key) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing['subdirs'].append(entry.name)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        listing['files'][entry.name] = [stat.st_size, stat.st_mtime_ns]
+            self.dirs[key] = listing
+
+        files = {name: size for name, (size, _) in listing['files'].items()}
+        return files, list(listing['subdirs'])
+
+    def save(self):
+        """Write index to JSON file (if a filepath was given)"""
+        if not self.filepath:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = self.filepath.with_suffix('.tmp')
+        with open(tmp_filepath, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'dirs': self.dirs}, f)
+        os.replace(tmp_filepath, self.filepath)
+
+
+class ProcessedFilesState:
+    """Raw data files that were already processed by EddyPro, kept across runs in a JSON file.
+
+    Used in incremental mode: files are identified by their filename (see
+    AggregatesCache) and count as processed as long as their size and
+    modification time did not change. Files are only marked as processed after
+    their results were added to the master full_output file.
+    """
+
+    VERSION = 1
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.files = {}
+        if self.filepath.is_file():
+            try:
+                with open(self.filepath, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('version') == self.VERSION:
+                    self.files = state['files']
+            except (OSError, ValueError, KeyError):
+                self.files = {}  # Unreadable state, all files are processed again
+
+    def pending(self, found_files: dict) -> dict:
+        """Files (filename and filepath) that were not processed yet or changed since"""
+        pending = {}
+        for filename, filepath in found_files.items():
+            entry = self.files.get(filename)
+            filesize, mtime_ns = file_signature(filepath)
+            if not entry or entry['size'] != filesize or entry['mtime_ns'] != mtime_ns:
+                pending[filename] = filepath
+        return pending
+
+    def mark_processed(self, files: dict, run_id: str):
+        """Remember files (filename and filepath) as processed in run run_id"""
+        for filename, filepath in files.items():
+            filesize, mtime_ns = file_signature(filepath)
+            self.files[filename] = {'size': filesize, 'mtime_ns': mtime_ns, 'run_id': run_id}
+
+    def save(self):
+        """Write state to JSON file"""
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = self.filepath.with_suffix('.tmp')
+        with open(tmp_filepath, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'files': self.files}, f)
+        os.replace(tmp_filepath, self.filepath)
+
+
+class StagedFileRefs:
+    """References from run folders to shared files, kept across runs in a SQLite file.
+
+    Uncompressed raw data files in the shared folder are staged into run folders
+    as links (see file.stage_file). Every staged file is a reference to its shared
+    file, references whose staged file no longer exists (e.g. the run folder was
+    deleted) are not counted. A shared file without references is not used by any
+    run folder and can be removed.
+
+    Runs that are started at the same time share the file: references are added
+    and removed in transactions, none are lost. Staging a shared file and removing
+    shared files (see UncompressedFileCache.evict) hold the write lock of the file
+    (see lock()), so a shared file is not removed while another run stages it.
+    """
+
+    LOCK_TIMEOUT_SECONDS = 600
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit, transactions are started explicitly in lock()
+        self.conn = sqlite3.connect(self.filepath, timeout=self.LOCK_TIMEOUT_SECONDS, isolation_level=None)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS refs (shared TEXT, staged TEXT, PRIMARY KEY (shared, staged))")
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Transaction that holds the write lock, other runs wait until it is finished"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def add(self, shared_filepath, staged_filepath):
+        """Remember that staged_filepath refers to shared_filepath"""
+        self.conn.execute("INSERT OR IGNORE INTO refs VALUES (?, ?)", (str(shared_filepath), str(staged_filepath)))
+
+    def num_refs(self, shared_filepath) -> int:
+        """Number of existing staged files that refer to shared_filepath"""
+        found = self.conn.execute("SELECT staged FROM refs WHERE shared = ?", (str(shared_filepath),)).fetchall()
+        return sum(1 for staged, in found if os.path.lexists(staged))
+
+    def release(self, staged_filepaths: list) -> list:
+        """Remove references of staged files, e.g. after they were deleted.
+
+        References of staged files that no longer exist are also removed.
+
+        Returns:
+            List of shared files that have no references left.
+        """
+        released = {str(staged_filepath) for staged_filepath in staged_filepaths}
+        with self.lock():
+            refs = self.conn.execute("SELECT shared, staged FROM refs").fetchall()
+            removed = {(shared, staged) for shared, staged in refs
+                       if staged in released or not os.path.lexists(staged)}
+            self.conn.executemany("DELETE FROM refs WHERE shared = ? AND staged = ?", sorted(removed))
+        referenced = {shared for shared, staged in refs if (shared, staged) not in removed}
+        return sorted({shared for shared, _ in removed} - referenced)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,155 @@
+import re
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Extra data columns without header get a new suffix in every run (see
+# ReadEddyProFullOutputFile), the suffix is removed to keep one column per position
+_UNKNOWN_COL_REGEX = re.compile(r'^(unknown_\d+)-\d+$')
+
+
+class FluxDatabase:
+    """Fluxes of all runs of a site in one SQLite file, one row per averaging period.
+
+    Rows are identified by the timestamp of the averaging period, results of
+    later runs replace results of earlier runs for the same timestamp (upsert).
+    Each variable of the EddyPro full output is one column, numeric variables
+    are stored as REAL and others as TEXT, missing values as NULL. Variables
+    that are new in a run are added as new columns. The units of the variables
+    and their column names are kept in the table 'variables'. Column names in
+    SQLite are case-insensitive, a variable whose name differs only by case from
+    an existing column (e.g. custom variables H and h) gets a column with a
+    numbered suffix (h_2).
+    """
+
+    TABLE = 'fluxes'
+    TIMESTAMP_COL = 'timestamp'
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+    INDEX_NAME = ('TIMESTAMP', '[yyyy-mm-dd HH:MM:SS]')
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.filepath)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            f"{self.TIMESTAMP_COL} TEXT PRIMARY KEY, run_id TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS variables (var TEXT PRIMARY KEY, units TEXT, sqltype TEXT, col TEXT)")
+        if 'col' not in [row[1] for row in self.conn.execute("PRAGMA table_info(variables)")]:
+            # Database written before column names were kept, columns were named like the variables
+            self.conn.execute("ALTER TABLE variables ADD COLUMN col TEXT")
+            self.conn.execute("UPDATE variables SET col = var")
+        self.conn.commit()
+
+    def variables(self) -> dict:
+        """Dict of variables in the database and their units"""
+        return dict(self.conn.execute("SELECT var, units FROM variables ORDER BY rowid").fetchall())
+
+    def _columns(self) -> dict:
+        """Dict of variables in the database and the names of their columns"""
+        return dict(self.conn.execute("SELECT var, col FROM variables ORDER BY rowid").fetchall())
+
+    def _new_column_name(self, var: str, columns: dict) -> str:
+        """Column name for a new variable that does not collide (case-insensitive) with existing columns"""
+        taken = {col.lower() for col in columns.values()} | {self.TIMESTAMP_COL, 'run_id'}
+        col = var
+        num = 1
+        while col.lower() in taken:
+            num += 1
+            col = f"{var}_{num}"
+        return col
+
+    def upsert(self, df: pd.DataFrame, run_id: str) -> tuple:
+        """Add or replace records of EddyPro full output data.
+
+        Args:
+            df: Full output data with 2-row header (var, units) and DatetimeIndex,
+                e.g. from ReadEddyProFullOutputFile.
+            run_id: Run that produced the data.
+
+        Returns:
+            Number of added and number of replaced records.
+        """
+        df = df.rename(columns=lambda var: _UNKNOWN_COL_REGEX.sub(r'\1', var), level=0)
+        known = self._columns()
+        for var, units in df.columns:
+            if var not in known:
+                col = self._new_column_name(var=var, columns=known)
+                sqltype = 'REAL' if pd.api.types.is_numeric_dtype(df[(var, units)]) else 'TEXT'
+                self.conn.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN {_quote(col)} {sqltype}")
+                self.conn.execute("INSERT INTO variables VALUES (?, ?, ?, ?)", (var, units, sqltype, col))
+                known[var] = col
+
+        timestamps = df.index.strftime(self.TIMESTAMP_FORMAT)
+        existing = set()
+        for start in range(0, len(timestamps), 500):
+            batch = list(timestamps[start:start + 500])
+            existing.update(row[0] for row in self.conn.execute(
+                f"SELECT {self.TIMESTAMP_COL} FROM {self.TABLE} "
+                f"WHERE {self.TIMESTAMP_COL} IN ({','.join('?' * len(batch))})", batch))
+
+        columns = [self.TIMESTAMP_COL, 'run_id'] + [known[var] for var, _ in df.columns]
+        quoted = [_quote(col) for col in columns]
+        updates = ', '.join(f"{col} = excluded.{col}" for col in quoted[1:])
+        values = df.astype(object).where(df.notna(), None).to_numpy()
+        rows = ((timestamp, run_id, *(_to_sql(value) for value in row)) for timestamp, row in zip(timestamps, values))
+        self.conn.executemany(
+            f"INSERT INTO {self.TABLE} ({', '.join(quoted)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({self.TIMESTAMP_COL}) DO UPDATE SET {updates}", rows)
+        self.conn.commit()
+        return len(timestamps) - len(existing), len(existing)
+
+    def read(self, start=None, end=None, variables: list = None) -> pd.DataFrame:
+        """Records between start and end (both included, None for no limit).
+
+        Returns:
+            Dataframe with 2-row header (var, units) and DatetimeIndex, like the
+            data of ReadEddyProFullOutputFile.
+
+        Raises:
+            ValueError: if variables contains variables that are not in the database.
+        """
+        units = self.variables()
+        columns = self._columns()
+        variables = list(units) if variables is None else list(variables)
+        unknown = [var for var in variables if var not in units]
+        if unknown:
+            raise ValueError(f"Variables not in flux database {self.filepath}: {', '.join(unknown)}")
+        if not variables:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name=self.INDEX_NAME))
+        where, params = [], []
+        if start is not None:
+            where.append(f"{self.TIMESTAMP_COL} >= ?")
+            params.append(pd.Timestamp(start).strftime(self.TIMESTAMP_FORMAT))
+        if end is not None:
+            where.append(f"{self.TIMESTAMP_COL} <= ?")
+            params.append(pd.Timestamp(end).strftime(self.TIMESTAMP_FORMAT))
+        selected = [self.TIMESTAMP_COL] + [columns[var] for var in variables]
+        query = f"SELECT {', '.join(_quote(col) for col in selected)} FROM {self.TABLE}"
+        if where:
+            query += f" WHERE {' AND '.join(where)}"
+        query += f" ORDER BY {self.TIMESTAMP_COL}"
+        df = pd.read_sql_query(query, self.conn, params=params)
+        index = pd.to_datetime(df.pop(self.TIMESTAMP_COL), format=self.TIMESTAMP_FORMAT)
+        df.index = pd.DatetimeIndex(index, name=self.INDEX_NAME)
+        df.columns = pd.MultiIndex.from_tuples([(var, units[var]) for var in variables])
+        return df
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def _quote(name: str) -> str:
+    """Quote column name for SQL, e.g. variables with units-like characters"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sql(value):
+    """Convert NumPy scalars to Python values that sqlite3 can store"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,251 @@
+import csv
+import os
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+PROGRESS_MARKER = 'processing new flux averaging period'
+
+# EddyPro full_output files: section row, variable names, units
+FULL_OUTPUT_NUM_HEADER_LINES = 3
+FULL_OUTPUT_TIMESTAMP_COLS = ['date', 'time']
+
+
+class EddyProProcess:
+    """Run an EddyPro executable and log its output without slowing it down.
+
+    stdout and stderr are read line by line in two threads and put into a bounded
+    queue, the calling thread takes the lines from the queue and logs them in
+    batches (one log call per batch instead of one per line). Lines that mark a
+    new flux averaging period are not logged but counted, the number of processed
+    averaging periods is logged with every batch when it changed. stderr lines
+    are logged as warnings.
+    """
+
+    QUEUE_MAX_LINES = 10000
+    BATCH_MAX_LINES = 500
+    BATCH_MAX_SECONDS = 2.0
+    _EOF = None
+
+    def __init__(self, executable, cwd, logger, log_prefix: str = '[EDDYPRO LOG]'):
+        """
+        Args:
+            executable: Full path to the executable, e.g. eddypro_rp.exe.
+            cwd: Working directory of the process (EddyPro bin folder).
+            logger: Logger for the output.
+            log_prefix: Prefix of all logged lines, followed by the executable name.
+        """
+        self.executable = Path(executable)
+        self.cwd = cwd
+        self.logger = logger
+        self.prefix = f"{log_prefix} [{self.executable.name}]"
+        self.num_periods = 0
+        self.num_lines = 0
+        self._logged_periods = 0
+        self._queue = queue.Queue(maxsize=self.QUEUE_MAX_LINES)
+
+    def run(self) -> int:
+        """Run the executable until it terminates, returns its return code"""
+        process = subprocess.Popen([str(self.executable)], cwd=self.cwd,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        readers = [threading.Thread(target=self._read_stream, args=(process.stdout, False), daemon=True),
+                   threading.Thread(target=self._read_stream, args=(process.stderr, True), daemon=True)]
+        for reader in readers:
+            reader.start()
+        self._pump(num_streams=len(readers))
+        for reader in readers:
+            reader.join()
+        return process.wait()
+
+    def _read_stream(self, stream, is_stderr: bool):
+        """Put the lines of a stream into the queue, runs in a reader thread"""
+        with stream:
+            for raw_line in iter(stream.readline, b''):
+                self._queue.put((is_stderr, raw_line.decode('utf-8', errors='replace').rstrip()))
+        self._queue.put(self._EOF)
+
+    def _pump(self, num_streams: int):
+        """Take lines from the queue and log them in batches until all streams are closed"""
+        batch, errors = [], []
+        last_flush = time.monotonic()
+        num_open = num_streams
+        while num_open > 0:
+            try:
+                item = self._queue.get(timeout=self.BATCH_MAX_SECONDS)
+            except queue.Empty:
+                item = False  # No output for a while, flush what was collected
+            if item is self._EOF:
+                num_open -= 1
+            elif item:
+                is_stderr, line = item
+                self.num_lines += 1
+                if is_stderr:
+                    errors.append(line)
+                elif PROGRESS_MARKER in line.lower():
+                    self.num_periods += 1
+                elif line:
+                    batch.append(line)
+            if len(batch) + len(errors) >= self.BATCH_MAX_LINES \
+                    or time.monotonic() - last_flush >= self.BATCH_MAX_SECONDS or num_open == 0:
+                self._flush(batch=batch, errors=errors)
+                batch, errors = [], []
+                last_flush = time.monotonic()
+
+    def _flush(self, batch: list, errors: list):
+        """Log collected lines with one call per log level and the progress counter"""
+        if batch:
+            self.logger.info('\n'.join(f"{self.prefix} {line}" for line in batch))
+        if errors:
+            self.logger.warning('\n'.join(f"{self.prefix} [stderr] {line}" for line in errors))
+        if self.num_periods != self._logged_periods:
+            self.logger.info(f"{self.prefix} Flux averaging periods processed: {self.num_periods}")
+            self._logged_periods = self.num_periods
+
+
+def split_into_windows(found_files: dict, filedates: dict, num_windows: int) -> list:
+    """Split files into contiguous time windows with about the same number of files each.
+
+    Args:
+        found_files: Dict of filenames and filepaths.
+        filedates: Dict of filenames and file dates, used for the time order.
+        num_windows: Number of windows, fewer windows are returned if there are
+            fewer files.
+
+    Returns:
+        List of dicts of filenames and filepaths, in time order.
+    """
+    names = sorted(found_files, key=lambda name: (filedates[name], name))
+    bounds = [round(ix * len(names) / num_windows) for ix in range(num_windows + 1)]
+    return [{name: found_files[name] for name in names[start:end]}
+            for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _read_full_output(filepath) -> tuple:
+    """Header lines and record lines (without empty lines) of a full_output file"""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        lines = f.readlines()
+    records = [line if line.endswith('\n') else line + '\n'
+               for line in lines[FULL_OUTPUT_NUM_HEADER_LINES:] if line.strip()]
+    return lines[:FULL_OUTPUT_NUM_HEADER_LINES], records
+
+
+def _timestamp_cols(header: list) -> list:
+    """Positions of the date and time columns"""
+    names = next(csv.reader([header[1]]))
+    return [names.index(col) for col in FULL_OUTPUT_TIMESTAMP_COLS]
+
+
+def _record_timestamp(record: str, cols: list) -> tuple:
+    """Date and time of a record line, e.g. ('2025-06-01', '00:30'), sortable as text"""
+    fields = record.split(',')
+    return tuple(fields[col] for col in cols)
+
+
+def _last_line(filepath, block_size: int = 65536) -> str:
+    """Last non-empty line of a text file, read from the end of the file"""
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b''
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            lines = data.rstrip(b'\r\n').split(b'\n')
+            if len(lines) > 1 or start == 0:
+                return lines[-1].decode('utf-8') + '\n'
+            end = start
+    return ''
+
+
+def merge_full_output_files(filepaths: list, outfile) -> int:
+    """Merge EddyPro full_output files of different time windows into one file.
+
+    The files are ordered by the timestamp of their first record, the header is
+    taken from the first file and data lines are copied as text, so values are
+    not changed. Files without records are skipped.
+
+    Returns:
+        Number of merged records.
+
+    Raises:
+        ValueError: if the header (variables and units) differs between files.
+    """
+    parts = []
+    for filepath in filepaths:
+        header, records = _read_full_output(filepath)
+        if not records:
+            continue
+        first_timestamp = _record_timestamp(records[0], cols=_timestamp_cols(header))
+        parts.append((first_timestamp, str(filepath), header, records))
+
+    if not parts:
+        return 0
+    parts.sort()
+    header = parts[0][2]
+    for _, filepath, other_header, _ in parts[1:]:
+        if other_header[1:] != header[1:]:
+            raise ValueError(f"Header of {filepath} differs from header of {parts[0][1]}.")
+
+    num_records = 0
+    with open(outfile, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(header)
+        for _, _, _, records in parts:
+            f.writelines(records)
+            num_records += len(records)
+    return num_records
+
+
+def update_master_full_output(master, new) -> tuple:
+    """Add the records of full_output file new to the master full_output file.
+
+    Records are identified by their timestamp (date and time), records of new
+    replace records of master with the same timestamp, e.g. from raw data files
+    that changed since they were processed. If all records of new are later
+    than the last record of master they are appended, otherwise master is
+    rewritten in time order. master is created if it does not exist.
+
+    Returns:
+        Number of added and number of replaced records.
+
+    Raises:
+        ValueError: if the header (variables and units) of new differs from master.
+    """
+    master = Path(master)
+    header, records = _read_full_output(new)
+    if not master.is_file():
+        master.parent.mkdir(parents=True, exist_ok=True)
+        with open(master, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(header + records)
+        return len(records), 0
+
+    with open(master, 'r', encoding='utf-8', newline='') as f:
+        master_header = [f.readline() for _ in range(FULL_OUTPUT_NUM_HEADER_LINES)]
+    if master_header[1:] != header[1:]:
+        raise ValueError(f"Header of {new} differs from header of {master}.")
+    cols = _timestamp_cols(header)
+
+    new_records = {_record_timestamp(record, cols=cols): record for record in records}
+    if not new_records:
+        return 0, 0
+
+    # Appending only needs the last record of master
+    last_record = _last_line(master)
+    if last_record.strip() in [line.strip() for line in master_header] \
+            or min(new_records) > _record_timestamp(last_record, cols=cols):
+        with open(master, 'a', encoding='utf-8', newline='') as f:
+            f.writelines(new_records[timestamp] for timestamp in sorted(new_records))
+        return len(new_records), 0
+
+    _, master_records = _read_full_output(master)
+    merged = {_record_timestamp(record, cols=cols): record for record in master_records}
+    num_replaced = sum(1 for timestamp in new_records if timestamp in merged)
+    merged.update(new_records)
+    tmp_filepath = master.with_suffix('.tmp')
+    with open(tmp_filepath, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(master_header)
+        f.writelines(merged[timestamp] for timestamp in sorted(merged))
+    os.replace(tmp_filepath, master)
+    return len(new_records) - num_replaced, num_replaced
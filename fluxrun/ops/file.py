@@ -1,11 +1,16 @@
+import csv
 import datetime as dt
 import fileinput
 import fnmatch
 import gzip
+import io
 import os
+import re
 import shutil
 import sys
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from shutil import copyfile
 
@@ -13,6 +18,17 @@ import numpy as np
 import pandas as pd
 import yaml
 
+try:
+    from .cache import ParsedFileCache, StagedFileRefs, UncompressedFileCache
+    from .logger import LogBuffer
+    from .setup import get_num_workers
+    from .stats import calc_aggregates_row
+except ImportError:
+    from cache import ParsedFileCache, StagedFileRefs, UncompressedFileCache
+    from logger import LogBuffer
+    from setup import get_num_workers
+    from stats import calc_aggregates_row
+
 
 def check_if_file_in_folder(search_str: str, folder: str):
     """Check if filename exists in a folder"""
@@ -27,19 +43,53 @@ def check_if_file_in_folder(search_str: str, folder: str):
     return file_is_in_folder, filepath
 
 
-def read_uncompr_ascii_file(settings, filepath, logger, section_id, verbose: bool = True) -> pd.DataFrame:
+def read_uncompr_ascii_file(settings, filepath, logger, section_id, verbose: bool = True,
+                            lean_dtypes: bool = None) -> pd.DataFrame:
+    """Read raw data file with 3-row MultiIndex header (var, units, instrument).
+
+    Compressed .gz files are read directly, pandas reads the data from the
+    decompressor without writing the uncompressed file to disk.
+
+    If RAWDATA: PARSED_CACHE is enabled, the parsed dataframe is kept in the cache
+    folder and later reads of the unchanged file (same name, size and modification
+    time) load the cached dataframe instead of parsing the file again. If RAWDATA:
+    LEAN_DTYPES is enabled, the dataframe is returned with memory-lean dtypes (see
+    to_lean_dtypes), the cache keeps the parsed dtypes.
+
+    Args:
+        lean_dtypes: Return memory-lean dtypes, None uses RAWDATA: LEAN_DTYPES. Data
+            that are written back to files must be read with False.
+    """
     if verbose:
         logger.info(f"{section_id}    Reading file {filepath} ...")
 
-    tic = time.time()   
+    tic = time.time()
+
+    parsed_cache = None
+    header_format = settings['RAWDATA']['HEADER_FORMAT']
+    if lean_dtypes is None:
+        lean_dtypes = int(settings['RAWDATA'].get('LEAN_DTYPES', 0)) == 1
+    if int(settings['RAWDATA'].get('PARSED_CACHE', 0)) == 1:
+        parsed_cache = ParsedFileCache(
+            dirpath=Path(settings['_dir_cache']) / 'parsed',
+            max_bytes=int(settings['RAWDATA'].get('PARSED_CACHE_MAX_MB', 10240)) * 1024 ** 2)
+        cached = parsed_cache.get(filepath=filepath, header_format=header_format)
+        if cached is not None:
+            df, warnings = cached
+            for msg in warnings:
+                logger.warning(msg)
+            if verbose:
+                logger.info(f"{section_id}    Finished ({time.time() - tic:.3f}s, cached). "
+                            f"Detected {len(df)} rows and {df.columns.size} columns.")
+            return to_lean_dtypes(df=df) if lean_dtypes else df
 
     # Check header format
-    if settings['RAWDATA']['HEADER_FORMAT'] == '3-row header (bico files)':
+    if header_format == '3-row header (bico files)':
         skiprows = None
-    elif settings['RAWDATA']['HEADER_FORMAT'] == '4-row header (rECord files)':
+    elif header_format == '4-row header (rECord files)':
         skiprows = [0]
     else:
-        raise NotImplementedError(f"{settings['RAWDATA']['HEADER_FORMAT']} is not implemented.")
+        raise NotImplementedError(f"{header_format} is not implemented.")
 
     read_csv_kwargs = dict(
         skiprows=skiprows,
@@ -52,6 +102,7 @@ def read_uncompr_ascii_file(settings, filepath, logger, section_id, verbose: boo
         dtype=None,
     )
 
+    warnings = []
     try:
         df = pd.read_csv(filepath, **read_csv_kwargs)
     except pd.errors.ParserError as e:
@@ -61,11 +112,27 @@ def read_uncompr_ascii_file(settings, filepath, logger, section_id, verbose: boo
         def _replace_bad(bad_line):
             return ['-9999'] * n_cols
 
-        logger.warning(
+        warnings.append(
             f"[LINE FIX] {section_id}: Inconsistent line(s) detected ({e}). "
             f"Bad lines replaced with -9999."
         )
-        df = pd.read_csv(filepath, **read_csv_kwargs, on_bad_lines=_replace_bad, engine='python')
+        logger.warning(warnings[-1])
+
+        with (gzip.open if Path(filepath).suffix == '.gz' else open)(filepath, 'rb') as f:
+            data = f.read()
+        if b'"' in data:
+            # Quoted fields can contain delimiters and newlines, use the python engine
+            df = pd.read_csv(filepath, **read_csv_kwargs, on_bad_lines=_replace_bad, engine='python')
+        else:
+            num_header_lines = len(skiprows or []) + len(read_csv_kwargs['header'])
+            data = _replace_bad_lines(data=data, n_cols=n_cols, num_header_lines=num_header_lines)
+            df = pd.read_csv(io.BytesIO(data), **read_csv_kwargs)
+
+    if parsed_cache is not None:
+        parsed_cache.put(filepath=filepath, header_format=header_format, df=df, warnings=warnings)
+
+    if lean_dtypes:
+        df = to_lean_dtypes(df=df)
 
     time_needed = time.time() - tic
     if verbose:
@@ -74,6 +141,22 @@ def read_uncompr_ascii_file(settings, filepath, logger, section_id, verbose: boo
     return df
 
 
+def _replace_bad_lines(data: bytes, n_cols: int, num_header_lines: int) -> bytes:
+    """Replace data lines with more than n_cols fields by a line of -9999 values.
+
+    Fields are counted with a byte-level scan of the delimiters in each line, only
+    the offending lines are replaced so the result can be parsed with the C engine.
+    Lines with fewer fields are kept and filled with NaN when parsed, the same as
+    with on_bad_lines in the python engine. Data must not contain quoted fields.
+    """
+    lines = data.split(b'\n')
+    bad_line = b','.join([b'-9999'] * n_cols)
+    for ix in range(num_header_lines, len(lines)):
+        if lines[ix].count(b',') >= n_cols:
+            lines[ix] = bad_line
+    return b'\n'.join(lines)
+
+
 def check_all_numeric(df: pd.DataFrame) -> bool:
     """
     Check if all columns in a pandas DataFrame are numeric.
@@ -88,6 +171,78 @@ def check_all_numeric(df: pd.DataFrame) -> bool:
     return len(numeric_columns) == len(df.columns)
 
 
+LEAN_INT_DTYPES = ['Int8', 'Int16', 'Int32', 'Int64']
+LEAN_COUNT_UNITS = '[#]'
+
+
+def to_lean_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert columns to memory-lean dtypes.
+
+    Float columns are converted to float32. Float columns with units [#] (quality
+    flags and counts, e.g. qc_co2_flux or used_records) that contain only whole
+    numbers are converted to the smallest nullable integer dtype (Int8 ... Int64),
+    integer columns are downcast and text columns with repeated values (at most
+    half of the values unique) are converted to category. Missing values stay
+    missing (NaN or <NA>). Columns are converted one by one into a new dataframe,
+    so besides the input only the lean copy is in memory.
+    """
+    arrays = []
+    for ix, col in enumerate(df.columns):
+        series = df.iloc[:, ix]
+        if pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy()
+            is_count = isinstance(col, tuple) and len(col) > 1 and col[1] == LEAN_COUNT_UNITS
+            int_dtype = _smallest_int_dtype(values=values) if is_count else None
+            arrays.append(pd.array(values, dtype=int_dtype) if int_dtype
+                          else values.astype(np.float32, copy=False))
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            arrays.append(pd.to_numeric(series, downcast='integer').array)
+        elif series.dtype == object and series.nunique() <= series.count() / 2:
+            arrays.append(series.astype('category').array)
+        else:
+            arrays.append(series.array)
+    lean_df = pd.DataFrame(dict(enumerate(arrays)), index=df.index)
+    lean_df.columns = df.columns
+    return lean_df
+
+
+def _concat_lean_chunks(chunks: list) -> pd.DataFrame:
+    """Concatenate chunks with lean dtypes (see to_lean_dtypes).
+
+    Columns that are missing in all records of a chunk are converted to the dtype
+    of the same column in the first chunk that has data (NumPy integers to the
+    nullable integer dtype), so the dtype of the result does not depend on chunks
+    without data.
+    """
+    for ix in range(chunks[0].shape[1]):
+        dtypes = [chunk.iloc[:, ix].dtype for chunk in chunks if chunk.iloc[:, ix].notna().any()]
+        if not dtypes:
+            continue
+        dtype = dtypes[0]
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+            dtype = pd.array(np.array([], dtype=dtype)).dtype
+        for chunk in chunks:
+            series = chunk.iloc[:, ix]
+            if series.dtype != dtype and not series.notna().any():
+                chunk.isetitem(ix, series.astype(dtype))
+    return pd.concat(chunks)
+
+
+def _smallest_int_dtype(values: np.ndarray):
+    """Smallest nullable integer dtype that holds all non-missing values, None if
+    there are values that are not whole numbers"""
+    valid = values[~np.isnan(values)]
+    if not np.isfinite(valid).all() or not (valid == np.round(valid)).all():
+        return None
+    if valid.size == 0:
+        return LEAN_INT_DTYPES[0]
+    for dtype in LEAN_INT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= valid.min() and valid.max() <= info.max:
+            return dtype
+    return None
+
+
 def add_level_to_header(df: pd.DataFrame, new_level_name: str = '', new_level_value: str = '') -> pd.DataFrame:
     """Validate number of header rows."""
     new_columns_tuples = []
@@ -98,100 +253,445 @@ def add_level_to_header(df: pd.DataFrame, new_level_name: str = '', new_level_va
     return df
 
 
-def validate_numeric_data(settings: dict, found_files: dict, logger):
-    """Ensure all data columns contain numeric data."""
+def _validate_file(settings: dict, filename: str, filepath: str, calc_aggregates: bool) -> dict:
+    """Validate numeric data of one file, runs in a worker process if validation is parallel.
+
+    Files with non-numeric values are written to _dir_out_run_rawdata_ascii_files
+    with the non-numeric values converted to -9999 (not .gz files that are read
+    directly, they are not used for flux calculations). Log messages are not logged
+    here but returned, so they can be logged in file order.
+
+    Returns:
+        Dict with the log messages ('log', LogBuffer), the aggregates ('aggregates',
+        tuple of columns and aggregates row, or None if calc_aggregates is False),
+        whether all data were numeric ('all_numeric'), the non-numeric columns that
+        were converted ('coerced_cols', empty if the file was not rewritten) and an
+        error message if the file still contains non-numeric data ('error').
+    """
+    log = LogBuffer()
+    result = dict(log=log, aggregates=None, all_numeric=False, coerced_cols=[], error=None)
+
+    # Files are checked and rewritten with the parsed dtypes, lean dtypes
+    # (RAWDATA: LEAN_DTYPES) are only used for the aggregates
+    lean_dtypes = int(settings['RAWDATA'].get('LEAN_DTYPES', 0)) == 1
+
+    df = pd.DataFrame()
+    if uncompressed_size(filepath) > 0:
+        try:
+            df = read_uncompr_ascii_file(settings=settings, filepath=filepath, logger=log, section_id=filename,
+                                         verbose=False, lean_dtypes=False)
+        except (EOFError, OSError, zlib.error) as e:
+            if Path(filepath).suffix != '.gz':
+                raise
+            log.warning(f"FILE {filename} COULD NOT BE UNZIPPED: {e}")
+
+    if df.empty:
+        log.warning(f"{filename} is empty and will be skipped.")
+        if calc_aggregates:
+            result['aggregates'] = calc_aggregates_row(df=df)
+        return result
+
+    # Check if all columns are numeric, yields True if yes and then continues with next file
+    if check_all_numeric(df=df):
+        result['all_numeric'] = True
+        if calc_aggregates:
+            result['aggregates'] = calc_aggregates_row(df=to_lean_dtypes(df=df) if lean_dtypes else df)
+        return result
+
+    # Select non-numeric columns
+    non_numeric_cols = df.select_dtypes(exclude=np.number).columns
+
+    # Convert non-numeric columns to numeric, coercing errors to NaN
+    for col in non_numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if calc_aggregates:
+        result['aggregates'] = calc_aggregates_row(df=to_lean_dtypes(df=df) if lean_dtypes else df)
+
+    # Fill NaN values (which resulted from non-numeric values) with -9999
+    df = df.fillna(-9999)
+
+    # Re-check if now all columns are numeric
+    if check_all_numeric(df=df):
+        pass
+    else:
+        result['error'] = f"{filename} STILL CONTAINS NON-NUMERIC RECORDS."
+        return result
+
+    # Re-establish original number of header rows
+    # Files from rECord have 4 header rows, so any corrected files also need to have
+    # the same number of header rows.
+    if settings['RAWDATA']['HEADER_FORMAT'] == '3-row header (bico files)':
+        pass
+    elif settings['RAWDATA']['HEADER_FORMAT'] == '4-row header (rECord files)':
+        df = add_level_to_header(df=df, new_level_value='TOA5')
+    else:
+        raise NotImplementedError(f"{settings['RAWDATA']['HEADER_FORMAT']} is not implemented.")
+
+    # Compressed files are only read directly if they are not used for flux calculations
+    if Path(filepath).suffix == '.gz':
+        log.warning(f"NON-NUMERIC VALUES IN FILE {filename}: "
+                    f"Non-numeric values were converted to -9999 in memory, the file is not rewritten.")
+        result['coerced_cols'] = list(non_numeric_cols)
+        return result
+
+    # Save file, a staged file can be a link to a shared file that must not change
+    filepath_out = Path(settings['_dir_out_run_rawdata_ascii_files']) / filename
+    if os.path.lexists(filepath_out):
+        os.remove(filepath_out)
+    df.to_csv(filepath_out, index=False)
+
+    log.warning(f"NON-NUMERIC VALUES IN FILE {filename}: "
+                f"Non-numeric values were converted to -9999. Columns with non-numeric values:")
+    for n in non_numeric_cols:
+        log.warning(f"    {n}")
+    result['coerced_cols'] = list(non_numeric_cols)
+    return result
+
+
+def validate_numeric_data(settings: dict, found_files: dict, logger, aggregates=None):
+    """Ensure all data columns contain numeric data.
+
+    Files are validated in parallel if RAWDATA: VALIDATION_WORKERS is larger
+    than 1, log messages are always logged in file order.
+
+    Args:
+        aggregates: Optional collector of per-file aggregates, e.g.
+            vis.PlotRawDataFilesAggregates created with collect=False. Aggregates
+            of each file are calculated right after it was read here and added
+            with aggregates.add_file_row(), so the file does not have to be read
+            a second time. Files that are unchanged since they were found to be
+            valid in a previous run are taken from the aggregates cache (if
+            enabled) and are not read at all.
+    """
+    num_workers = get_num_workers(settings['RAWDATA'].get('VALIDATION_WORKERS', 1))
+
+    cached = {}
+    jobs = {}
     for filename, filepath in found_files.items():
-        logger.info(f"[VALIDATING NUMERIC DATA] {filename} ...")
         filepath = str(filepath)
+        if aggregates is not None:
+            cached_aggs = aggregates.get_cached_file(fid=filename, filepath=filepath)
+            if cached_aggs is not None:
+                cached[filename] = cached_aggs
+                continue
+        jobs[filename] = filepath
+
+    executor = None
+    futures = {}
+    if num_workers > 1 and len(jobs) > 1:
+        logger.info(f"[VALIDATING NUMERIC DATA] Validating {len(jobs)} files using {num_workers} workers ...")
+        executor = ProcessPoolExecutor(max_workers=num_workers)
+        futures = {filename: executor.submit(_validate_file, settings, filename, filepath, aggregates is not None)
+                   for filename, filepath in jobs.items()}
+
+    rewritten = {}
+    try:
+        for filename in found_files:
+            logger.info(f"[VALIDATING NUMERIC DATA] {filename} ...")
 
-        filesize = os.path.getsize(filepath)
-        if filesize > 0:
-            df = read_uncompr_ascii_file(settings=settings, filepath=filepath, logger=logger, section_id=filename,
-                                         verbose=False)
-        else:
-            df = pd.DataFrame()
+            if filename in cached:
+                logger.info(f"[VALIDATING NUMERIC DATA] {filename} is unchanged since a previous run "
+                            f"and contains only numeric data (cached).")
+                aggregates.add_cached_file(fid=filename, columns=cached[filename][0], row=cached[filename][1])
+                continue
 
-        if df.empty:
-            logger.warning(f"{filename} is empty and will be skipped.")
-            continue
+            if executor is not None:
+                result = futures[filename].result()
+            else:
+                result = _validate_file(settings=settings, filename=filename, filepath=jobs[filename],
+                                        calc_aggregates=aggregates is not None)
+            result['log'].replay(logger=logger)
 
-        # Check if all columns are numeric, yields True if yes and then continues with next file
-        if check_all_numeric(df=df):
-            continue
+            if aggregates is not None:
+                columns, row = result['aggregates']
+                aggregates.add_file_row(fid=filename, columns=columns, row=row, filepath=jobs[filename],
+                                        all_numeric=result['all_numeric'])
 
-        # Select non-numeric columns
-        non_numeric_cols = df.select_dtypes(exclude=np.number).columns
+            if result['error']:
+                logger.error(result['error'])
+                raise ValueError(result['error'])
 
-        # Convert non-numeric columns to numeric, coercing errors to NaN
-        for col in non_numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            if result['coerced_cols']:
+                rewritten[filename] = result['coerced_cols']
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
-        # Fill NaN values (which resulted from non-numeric values) with -9999
-        df = df.fillna(-9999)
+    logger.info(f"[VALIDATING NUMERIC DATA] Validated {len(found_files)} files "
+                f"({len(cached)} unchanged files from cache), {len(rewritten)} files "
+                f"with non-numeric values converted to -9999.")
+    for filename, coerced_cols in rewritten.items():
+        logger.info(f"[VALIDATING NUMERIC DATA]    {filename}: {', '.join(str(col) for col in coerced_cols)}")
 
-        # Re-check if now all columns are numeric
-        if check_all_numeric(df=df):
-            pass
-        else:
-            msg = f"{filename} STILL CONTAINS NON-NUMERIC RECORDS."
-            logger.error(msg)
-            raise ValueError(msg)
-
-        # Re-establish original number of header rows
-        # Files from rECord have 4 header rows, so any corrected files also need to have
-        # the same number of header rows.
-        if settings['RAWDATA']['HEADER_FORMAT'] == '3-row header (bico files)':
-            pass
-        elif settings['RAWDATA']['HEADER_FORMAT'] == '4-row header (rECord files)':
-            df = add_level_to_header(df=df, new_level_value='TOA5')
-        else:
-            raise NotImplementedError(f"{settings['RAWDATA']['HEADER_FORMAT']} is not implemented.")
 
-        # Save file
-        filepath_out = Path(settings['_dir_out_run_rawdata_ascii_files']) / filename
-        df.to_csv(filepath_out, index=False)
+def _uncompress_gz_file(compr_filepath: str, uncompr_filepath: str, chunk_size: int) -> tuple:
+    """Unzip one .gz file, also used in worker processes.
 
-        logger.warning(f"NON-NUMERIC VALUES IN FILE {filename}: "
-                       f"Non-numeric values were converted to -9999. Columns with non-numeric values:")
-        for n in non_numeric_cols:
-            logger.warning(f"    {n}")
+    Like gunzip, the uncompressed file keeps the modification time of the .gz
+    file, so unchanged files can be recognized across runs. The access time is
+    the time of unzipping, the file counts as just used (see
+    cache.UncompressedFileCache.evict). The file is written under a temporary
+    name first, an interrupted or failed unzip leaves no incomplete file.
+
+    Returns:
+        Size of the compressed file, size of the uncompressed file (both in bytes)
+        and the time needed (in seconds).
+    """
+    tic = time.time()
+    tmp_filepath = f"{uncompr_filepath}.{os.getpid()}.tmp"
+    try:
+        with gzip.open(compr_filepath, 'rb') as f_in:
+            with open(tmp_filepath, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, chunk_size)
+        os.utime(tmp_filepath, ns=(time.time_ns(), os.stat(compr_filepath).st_mtime_ns))
+        os.replace(tmp_filepath, uncompr_filepath)
+    except BaseException:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        raise
+    return os.path.getsize(compr_filepath), os.path.getsize(uncompr_filepath), time.time() - tic
+
+
+def uncompressed_size(filepath) -> int:
+    """Size of the uncompressed data of a file in bytes, .gz files are not unzipped.
+
+    For .gz files the size is taken from the gzip trailer (ISIZE, last 4 bytes),
+    i.e. the size modulo 4 GB of the last member of the file. Raw data files are
+    smaller and written as one member.
+    """
+    filesize = os.path.getsize(filepath)
+    if Path(filepath).suffix != '.gz':
+        return filesize
+    if filesize < 4:
+        return 0
+    with open(filepath, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        return int.from_bytes(f.read(4), byteorder='little')
 
 
 def uncompress_gz(settings: dict, found_gz_files: dict, logger):
-    """Unzip compressed .gz files to output folder of current run"""
+    """Unzip compressed .gz files to output folder of current run
+
+    Files are unzipped in a process pool if RAWDATA:UNCOMPRESS_WORKERS is not 1
+    (0 uses all CPU cores). RAWDATA:UNCOMPRESS_CHUNK_SIZE_KB sets the size of the
+    chunks that are streamed from the decompressor to the output file. Results
+    are logged in the same order as found_gz_files.
+
+    If RAWDATA:UNCOMPRESSED_CACHE is enabled, files are unzipped to the shared
+    cache folder 'uncompressed' (see cache.UncompressedFileCache) and staged
+    (linked) into the run folder. Only files that are not in the cache are
+    unzipped. The references from run folders to cached files are kept in
+    'uncompressed_refs.sqlite'.
+    """
+    section_id = "[UNZIPPING GZ RAW DATA (ASCII) FILES]"
+    num_workers = get_num_workers(settings['RAWDATA'].get('UNCOMPRESS_WORKERS', 1))
+    chunk_size = int(settings['RAWDATA'].get('UNCOMPRESS_CHUNK_SIZE_KB', 1024)) * 1024
+    dir_run = Path(settings['_dir_out_run_rawdata_ascii_files'])
+    uncompressed_cache = None
+    staged_refs = None
+    if int(settings['RAWDATA'].get('UNCOMPRESSED_CACHE', 0)) == 1:
+        uncompressed_cache = UncompressedFileCache(dirpath=Path(settings['_dir_cache']) / 'uncompressed')
+        uncompressed_cache.dirpath.mkdir(parents=True, exist_ok=True)
+        staged_refs = StagedFileRefs(filepath=Path(settings['_dir_cache']) / 'uncompressed_refs.sqlite')
+
+    jobs = {}
+    reused = {}
     for compr_filename, compr_filepath in found_gz_files.items():
-        try:
-            compr_filepath = str(compr_filepath)
-            uncompr_filename = Path(compr_filename).stem
-            uncompr_filepath = Path(settings['_dir_out_run_rawdata_ascii_files']) / uncompr_filename
-            tic = time.time()
-            with gzip.open(compr_filepath, 'rb') as f_in:
-                logger.info(f"Trying to unzip file {compr_filepath} ...")
-                with open(uncompr_filepath, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-                    time_needed = time.time() - tic
-                    logger.info(f"[UNZIPPING GZ RAW DATA (ASCII) FILES] {compr_filepath} --> {uncompr_filepath} "
+        uncompr_filename = Path(compr_filename).stem
+        if uncompressed_cache:
+            cached_filepath = uncompressed_cache.get(compr_filepath)
+            if cached_filepath:
+                reused[compr_filename] = (str(compr_filepath), str(cached_filepath))
+                continue
+            uncompr_filepath = uncompressed_cache.entry_filepath(compr_filepath)
+        else:
+            uncompr_filepath = dir_run / uncompr_filename
+        jobs[compr_filename] = (str(compr_filepath), str(uncompr_filepath), chunk_size)
+
+    tic = time.time()
+    executor = None
+    if num_workers > 1 and len(jobs) > 1:
+        logger.info(f"{section_id} Unzipping {len(jobs)} files using {num_workers} worker processes ...")
+        executor = ProcessPoolExecutor(max_workers=num_workers)
+        futures = {compr_filename: executor.submit(_uncompress_gz_file, *args)
+                   for compr_filename, args in jobs.items()}
+
+    total_compr_bytes = 0
+    total_uncompr_bytes = 0
+    num_uncompressed = 0
+    staging = {}
+    try:
+        for compr_filename in found_gz_files:
+            try:
+                if compr_filename in reused:
+                    compr_filepath, uncompr_filepath = reused[compr_filename]
+                    logger.info(f"{section_id} {compr_filepath} --> {uncompr_filepath} (from cache)")
+                else:
+                    compr_filepath, uncompr_filepath, _ = jobs[compr_filename]
+                    if executor:
+                        compr_bytes, uncompr_bytes, time_needed = futures[compr_filename].result()
+                    else:
+                        logger.info(f"Trying to unzip file {compr_filepath} ...")
+                        compr_bytes, uncompr_bytes, time_needed = _uncompress_gz_file(*jobs[compr_filename])
+                    logger.info(f"{section_id} {compr_filepath} --> {uncompr_filepath} "
                                 f"(done in {time_needed:.3f}s)")
+                    total_compr_bytes += compr_bytes
+                    total_uncompr_bytes += uncompr_bytes
+                    num_uncompressed += 1
+
+                if staged_refs:
+                    staged_filepath = dir_run / Path(compr_filename).stem
+                    with staged_refs.lock():
+                        if not os.path.isfile(uncompr_filepath):
+                            raise FileNotFoundError(f"{uncompr_filepath} was removed from the cache by another run")
+                        method = stage_file(src=uncompr_filepath, dst=staged_filepath)
+                        staged_refs.add(shared_filepath=uncompr_filepath, staged_filepath=staged_filepath)
+                    staging[method] = staging.get(method, 0) + 1
+
+            except Exception as e:
+                logger.warning(f"FILE {compr_filename} SKIPPED DURING UNCOMPRESSION: {e}")
+    finally:
+        if executor:
+            executor.shutdown()
+        if staged_refs:
+            staged_refs.close()
 
-        except Exception as e:
-            logger.warning(f"FILE {compr_filename} SKIPPED DURING UNCOMPRESSION: {e}")
+    time_needed = time.time() - tic
+    throughput = total_uncompr_bytes / 1_000_000 / time_needed if time_needed > 0 else 0
+    logger.info(f"{section_id} Unzipped {num_uncompressed} of {len(found_gz_files)} files "
+                f"({total_compr_bytes / 1_000_000:.1f} MB --> {total_uncompr_bytes / 1_000_000:.1f} MB) "
+                f"in {time_needed:.3f}s ({throughput:.1f} MB/s)")
+    if staged_refs:
+        logger.info(f"{section_id} {len(reused)} files were already unzipped in {uncompressed_cache.dirpath}, "
+                    f"staged into {dir_run}: "
+                    f"{', '.join(f'{num} {method}' for method, num in sorted(staging.items())) or 'none'}")
+
+
+def stage_file(src, dst) -> str:
+    """Make file src available as dst without copying its data.
+
+    dst is a hard link to src if possible, otherwise a symbolic link (e.g. src is
+    on a different drive), the file is only copied if links are not possible
+    (e.g. no permission to create symbolic links on Windows). An existing dst is
+    replaced.
+
+    Returns:
+        'hardlink', 'symlink' or 'copy'.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(src), dst)
+        return 'symlink'
+    except OSError:
+        shutil.copy2(src, dst)
+        return 'copy'
+
+
+# Regex for datetime directives used in filename parsing strings, e.g. SITE_%Y%m%d-%H%M.csv,
+# the same patterns as in strptime (e.g. months without leading zero are accepted)
+FILENAME_DATETIME_DIRECTIVES = {
+    '%Y': r'(\d\d\d\d)',
+    '%m': r'(1[0-2]|0[1-9]|[1-9])',
+    '%d': r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    '%H': r'(2[0-3]|[0-1]\d|\d)',
+    '%M': r'([0-5]\d|\d)',
+}
+
+
+class FilenameMatcher:
+    """Parse file dates from filenames with a compiled regex
+
+    The regex is derived from the Python datetime parsing string, e.g.
+    'SITE_%Y%m%d-%H%M.csv.gz'. This is much faster than calling strptime in a
+    try/except for every file, which matters for archives with many files.
+    Filenames are matched like strptime does (same patterns for the directives,
+    case-insensitive). Parsing strings with other directives than %Y, %m, %d, %H
+    and %M fall back to strptime.
+    """
+
+    def __init__(self, parse_str_py: str):
+        self.parse_str_py = parse_str_py
+        self.directives = []
+        pattern = ''
+        for part in re.split(r'(%.)', parse_str_py):
+            if part in FILENAME_DATETIME_DIRECTIVES:
+                self.directives.append(part)
+                pattern += FILENAME_DATETIME_DIRECTIVES[part]
+            elif part.startswith('%') and len(part) == 2 and part != '%%':
+                pattern = None
+                break
+            else:
+                pattern += re.escape(part.replace('%%', '%'))
+        self.regex = re.compile(pattern + r'\Z', re.IGNORECASE) if pattern is not None else None
+
+    def parse(self, filename: str):
+        """Return file date of filename, None if filename does not match the parsing string"""
+        if self.regex is None:
+            try:
+                return dt.datetime.strptime(filename, self.parse_str_py)
+            except ValueError:
+                return None
+        match = self.regex.match(filename)
+        if not match:
+            return None
+        parts = {'%Y': 1900, '%m': 1, '%d': 1, '%H': 0, '%M': 0}
+        for directive, value in zip(self.directives, match.groups()):
+            parts[directive] = int(value.strip())
+        try:
+            return dt.datetime(year=parts['%Y'], month=parts['%m'], day=parts['%d'],
+                               hour=parts['%H'], minute=parts['%M'])
+        except ValueError:
+            return None
 
 
-def copy_rawdata_files(settings_dict, found_csv_files_dict, logger):
-    """Copy csv files to output folder of current run"""
-    for filename, filepath in found_csv_files_dict.items():
-        destination = Path(settings_dict['_dir_out_run_rawdata_ascii_files']) / filename
-        shutil.copy(filepath, destination)
-        logger.info(f"[GETTING CSV RAW DATA FILES] {filepath} --> {destination}")
+def subdir_outside_daterange(name: str, parent_year, start_date: dt.datetime, end_date: dt.datetime):
+    """Check if a folder name indicates a year or month outside the date range
+
+    Recognized folder names are years (2025), years with months (202510, 2025-10,
+    2025_10) and months (10) in a year folder. Folders with other names are
+    never outside the date range.
+
+    Returns:
+        Tuple (outside, year), year is passed on as parent_year to the subfolders
+        of year folders (None below month folders, their subfolders are not months).
+    """
+    year_month = re.fullmatch(r'(\d{4})(?:[-_]?(\d{2}))?', name)
+    if year_month:
+        year = int(year_month.group(1))
+        month = int(year_month.group(2)) if year_month.group(2) else None
+    elif parent_year and re.fullmatch(r'\d{2}', name):
+        year, month = parent_year, int(name)
+    else:
+        return False, parent_year
+    if not 1900 <= year <= 2100 or (month is not None and not 1 <= month <= 12):
+        return False, parent_year
+    if month is None:
+        return not start_date.year <= year <= end_date.year, year
+    return not (start_date.year, start_date.month) <= (year, month) <= (end_date.year, end_date.month), None
 
 
 class SearchAll:
-    def __init__(self, logger, search_in_dir, settings, search_uncompressed=False):
+    def __init__(self, logger, search_in_dir, settings, search_uncompressed=False, file_index=None):
+        """
+        Args:
+            file_index: Optional cache.DirectoryIndex, folders that were not modified
+                since they were last listed are then looked up instead of listed.
+        """
         self.logger = logger
+        self.file_index = file_index
         self.valid_files_dict = {}
+        self.filedates = {}  # Filename --> file date, parsed only once
         self.search_in_dir = search_in_dir
         self.rawdata_start_date = settings['RAWDATA']['START_DATE']
         self.rawdata_end_date = settings['RAWDATA']['END_DATE']
+        self.skip_date_folders = int(settings['RAWDATA'].get('SKIP_DATE_FOLDERS', 0)) == 1
 
         if search_uncompressed:
             self.site_parse_str_py = settings['_sitefiles_parse_str_python_uncompr']  # Parsing string in Python format
@@ -212,32 +712,72 @@ class SearchAll:
         return self.valid_files_dict
 
     def search_all(self, dir, site_parse_str_py, logger):
-        """Search all files that can be parsed with the parsing string."""
+        """Search all files that can be parsed with the parsing string.
+
+        If RAWDATA: SKIP_DATE_FOLDERS is enabled, subfolders with names that
+        indicate a year or month outside the selected date range (e.g. 2019 or
+        2019/04) are skipped.
+        """
         logger.info(f"{'-' * 20}")
         logger.info("SEARCH FILES")
         logger.info(f"{'-' * 20}")
         logger.info(f"Searching for files that fit the pattern {self.site_parse_str_py} ...")
+        matcher = FilenameMatcher(parse_str_py=site_parse_str_py)
+        run_start_date = dt.datetime.strptime(self.rawdata_start_date, '%Y-%m-%d %H:%M')
+        run_end_date = dt.datetime.strptime(self.rawdata_end_date, '%Y-%m-%d %H:%M')
         valid_files_dict = {}
         empty_files = []
-        for root, dirs, found_files in os.walk(dir):
-            for idx, file in enumerate(found_files):
-                try:
-                    rawdata_filedate = dt.datetime.strptime(file, self.site_parse_str_py)
-                    filepath = Path(root) / file
-
-                    # Keep only files with size > 0
-                    filesize = os.path.getsize(filepath)
-                    if filesize > 0:
-                        valid_files_dict[file] = filepath
-                    else:
-                        empty_files.append(filepath)
+        skipped_dirs = []
 
-                except ValueError:
+        def _scan(scan_dir, parent_year):
+            if self.file_index is not None:
+                # Lookup, folder is only listed again if it was modified
+                files, subdir_names = self.file_index.list_dir(scan_dir)
+                get_size = files.get
+            else:
+                with os.scandir(scan_dir) as entries:
+                    entries = list(entries)
+                files = {entry.name: entry for entry in entries
+                         if not entry.is_dir(follow_symlinks=False) and entry.is_file()}
+                subdir_names = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+                get_size = lambda name: files[name].stat().st_size
+
+            for name in files:
+                rawdata_filedate = matcher.parse(name)
+                if rawdata_filedate is None:
                     continue
+                filepath = Path(scan_dir) / name
+
+                # Keep only files with size > 0
+                if get_size(name) > 0:
+                    valid_files_dict[name] = filepath
+                    self.filedates[name] = rawdata_filedate
+                else:
+                    empty_files.append(filepath)
+
+            for name in subdir_names:
+                year = None
+                if self.skip_date_folders:
+                    outside, year = subdir_outside_daterange(name=name, parent_year=parent_year,
+                                                             start_date=run_start_date, end_date=run_end_date)
+                    if outside:
+                        skipped_dirs.append(Path(scan_dir) / name)
+                        continue
+                _scan(os.path.join(scan_dir, name), year)
+
+        _scan(dir, None)
+        if self.file_index is not None:
+            self.file_index.save()
+            logger.info(f"File index: {self.file_index.num_listed} folders listed, "
+                        f"{self.file_index.num_lookups} unchanged folders looked up")
         logger.info(f"Found {len(valid_files_dict)} files matching {site_parse_str_py} in {dir}")
         logger.info(f"Ignored {len(empty_files)} empty files matching {site_parse_str_py} in {dir}")
         for ef in empty_files:
             logger.info(f"  [EMPTY FILE] File {ef} is empty")
+        if self.skip_date_folders:
+            logger.info(f"Skipped {len(skipped_dirs)} folders outside the selected time range in {dir}")
+            for sd in skipped_dirs:
+                logger.debug(f"  [SKIPPED FOLDER] {sd}")
         return valid_files_dict
 
     @staticmethod
@@ -259,7 +799,7 @@ class SearchAll:
         _invalid_files_dict = {}
         valid_files_dict = {}
         for filename, filepath in self.valid_files_dict.items():
-            rawdata_filedate = dt.datetime.strptime(filename, site_parse_str_py)
+            rawdata_filedate = self.filedates[filename]
             if (rawdata_filedate < run_start_date) | (rawdata_filedate > run_end_date):
                 self.logger.info(
                     f"{suffix} Date of file ({filename}, date: {rawdata_filedate}) is outside the selected time range"
@@ -284,6 +824,10 @@ class SearchAll:
 class PrepareEddyProFiles:
     """Copy EddyPro *.processing and *.metadata file to run folder"""
 
+    # EddyPro executables, without file extension outside Windows
+    APP_RP = 'eddypro_rp.exe' if os.name == 'nt' else 'eddypro_rp'
+    APP_FCC = 'eddypro_fcc.exe' if os.name == 'nt' else 'eddypro_fcc'
+
     def __init__(self, logger, settings_dict):
         self.logger = logger
         self.settings_dict = settings_dict
@@ -408,16 +952,22 @@ class PrepareEddyProFiles:
             print(line.replace(old, new), end='')
 
     def prepare_app(self):
-        """Copy app files to run folder, e.g. Windows exe"""
+        """Copy app files to run folder, e.g. Windows exe
+
+        Files are copied from FLUX_PROCESSING: EDDYPRO_APP_DIR if given (e.g. a Linux
+        build of EddyPro), otherwise from the Windows app that comes with fluxrun.
+        """
 
         # Operating system
-        dir_app = Path(self.settings_dict['_dir_script']) / 'eddypro_app'
-        if os.name == 'nt':
-            os_subdir = 'windows'
+        dir_app_setting = self.settings_dict['FLUX_PROCESSING'].get('EDDYPRO_APP_DIR')
+        if dir_app_setting:
+            dir_app = Path(dir_app_setting)
+        elif os.name == 'nt':
+            dir_app = Path(self.settings_dict['_dir_script']) / 'eddypro_app' / 'windows'
         else:
-            self.logger(f"OPERATING SYSTEM {os.name} NOT IMPLEMENTED.")
+            self.logger.error(f"OPERATING SYSTEM {os.name} NOT IMPLEMENTED. "
+                              f"Set FLUX_PROCESSING: EDDYPRO_APP_DIR to a folder with the EddyPro executables.")
             sys.exit(-1)
-        dir_app = dir_app / os_subdir
 
         # Copy all files to bin folder
         for root, dirs, found_files in os.walk(dir_app):
@@ -427,18 +977,18 @@ class PrepareEddyProFiles:
 
         # Set path to executables
         self.settings_dict['_path_used_eddypro_app_rp'] = \
-            Path(self.settings_dict['_dir_out_run_eddypro_bin']) / 'eddypro_rp.exe'
+            Path(self.settings_dict['_dir_out_run_eddypro_bin']) / self.APP_RP
         self.settings_dict['_path_used_eddypro_app_fcc'] = \
-            Path(self.settings_dict['_dir_out_run_eddypro_bin']) / 'eddypro_fcc.exe'
+            Path(self.settings_dict['_dir_out_run_eddypro_bin']) / self.APP_FCC
 
         # Check if files available
         if not Path(self.settings_dict['_path_used_eddypro_app_rp']).is_file():
-            self.logger.info(f"EXECUTABLE eddypro_rp.exe WAS NOT FOUND "
+            self.logger.info(f"EXECUTABLE {self.APP_RP} WAS NOT FOUND "
                              f"IN FOLDER: {self.settings_dict['_dir_out_run_eddypro_bin']}")
             sys.exit(-1)
 
         if not Path(self.settings_dict['_path_used_eddypro_app_fcc']).is_file():
-            self.logger.info(f"EXECUTABLE eddypro_fcc.exe WAS NOT FOUND "
+            self.logger.info(f"EXECUTABLE {self.APP_FCC} WAS NOT FOUND "
                              f"IN FOLDER: {self.settings_dict['_dir_out_run_eddypro_bin']}")
             sys.exit(-1)
 
@@ -509,8 +1059,16 @@ class ReadEddyProFullOutputFile:
     TIMESTAMP_OUT_NAME = ('TIMESTAMP', '[yyyy-mm-dd HH:MM:SS]')
     PARSED_INDEX_COL = ('index', '[parsed]')
 
-    def __init__(self, filepath):
+    LEAN_CHUNK_ROWS = 10000
+
+    def __init__(self, filepath, lean_dtypes: bool = False):
+        """
+        Args:
+            lean_dtypes: Convert the data to memory-lean dtypes (see to_lean_dtypes),
+                e.g. float32 instead of float64.
+        """
         self.filepath = filepath
+        self.lean_dtypes = lean_dtypes
         self.data_df = pd.DataFrame()
         self.run()
 
@@ -523,13 +1081,21 @@ class ReadEddyProFullOutputFile:
                                             header_rows_list=self.DATA_HEADER_ROWS)
 
         # Read data file
-        parse_dates, date_parser = self.dateparser_settings()
-        self.data_df = self.read_file(header_cols_list=header_cols_list,
-                                      parse_dates=parse_dates,
-                                      date_parser=date_parser)
+        if self.lean_dtypes:
+            # Chunks of records are converted to lean dtypes right after parsing, so
+            # the whole file is never in memory with float64 columns
+            chunks = self.read_file(header_cols_list=header_cols_list, chunksize=self.LEAN_CHUNK_ROWS)
+            self.data_df = _concat_lean_chunks(
+                chunks=[to_lean_dtypes(df=self.parse_timestamp(df=chunk)) for chunk in chunks])
+        else:
+            self.data_df = self.read_file(header_cols_list=header_cols_list)
+            self.data_df = self.parse_timestamp(df=self.data_df)
 
         self.data_df = self.sanitize(df=self.data_df)
         self.data_df = self.standardize_index(df=self.data_df)
+        if self.lean_dtypes:
+            # Harmonize dtypes that differ between chunks, e.g. categories
+            self.data_df = to_lean_dtypes(df=self.data_df)
 
     def get(self):
         return self.data_df
@@ -538,8 +1104,14 @@ class ReadEddyProFullOutputFile:
         # There exist certain instances where the float64 data column can contain
         # non-numeric values that are interpreted as a float64 inf, which is basically
         # a NaN value. To harmonize missing values inf is also set to NaN.
-        df = df.replace(float('inf'), np.nan)
-        df = df.replace(float('-inf'), np.nan)
+        # Values are masked in place with NumPy, only columns that contain inf are
+        # written, missing values (-9999) are already NaN after reading.
+        for ix in range(df.shape[1]):
+            values = df.iloc[:, ix].to_numpy()
+            if values.dtype.kind == 'f':
+                is_inf = np.isinf(values)
+                if is_inf.any():
+                    df.iloc[is_inf, ix] = np.nan
         return df
 
     def standardize_index(self, df):
@@ -550,31 +1122,33 @@ class ReadEddyProFullOutputFile:
         df.index = pd.to_datetime(df.index)
         return df
 
-    def read_file(self, header_cols_list, parse_dates, date_parser):
+    def read_file(self, header_cols_list, chunksize: int = None):
+        """Read data, returns an iterator of dataframes with chunksize records if chunksize is given"""
         data_df = pd.read_csv(self.filepath,
                               skiprows=self.DATA_HEADER_SECTION_ROWS,
                               header=None,
-                              names=header_cols_list,
+                              names=pd.MultiIndex.from_tuples(header_cols_list),
                               na_values=self.DATA_NA_VALUES,
                               encoding='utf-8',
                               delimiter=self.DATA_DELIMITER,
-                              # mangle_dupe_cols=True,
-                              keep_date_col=False,
-                              parse_dates=parse_dates,
-                              date_parser=date_parser,
                               index_col=None,
-                              dtype=None,
+                              dtype={col: str for col in self.TIMESTAMP_INDEX_COLUMN},
                               skip_blank_lines=True,
-                              engine='python')
+                              float_precision='round_trip',
+                              chunksize=chunksize,
+                              engine='c')
         return data_df
 
-    def dateparser_settings(self):
-        """Column settings for parsing dates / times correctly"""
-        parsed_index_col = self.PARSED_INDEX_COL
-        parse_dates = self.TIMESTAMP_INDEX_COLUMN
-        parse_dates = {parsed_index_col: parse_dates}
-        date_parser = lambda x: dt.datetime.strptime(x, self.TIMESTAMP_DATETIME_FORMAT)
-        return parse_dates, date_parser
+    def parse_timestamp(self, df):
+        """Combine date and time columns to a timestamp column, vectorized with a fixed format.
+
+        The date and time columns are removed, the timestamp is added as the first column.
+        """
+        date_col, time_col = self.TIMESTAMP_INDEX_COLUMN
+        timestamp = pd.to_datetime(df[date_col] + ' ' + df[time_col], format=self.TIMESTAMP_DATETIME_FORMAT)
+        df = df.drop(columns=[date_col, time_col])
+        df.insert(0, self.PARSED_INDEX_COL, timestamp)
+        return df
 
     def compare_len_header_vs_data(self, filepath, skip_rows_list, header_rows_list):
         """
@@ -586,14 +1160,16 @@ class ReadEddyProFullOutputFile:
         of the first data row and the length of the header row(s) can be used to
         automatically generate names for the missing header columns.
         """
-        # Check number of columns of the first data row after the header part
+        # Read header part and first data row only once
         skip_num_lines = len(header_rows_list) + len(skip_rows_list)
-        first_data_row_df = pd.read_csv(filepath, skiprows=skip_num_lines,
-                                        header=None, nrows=1)
-        len_data_cols = first_data_row_df.columns.size
+        with open(filepath, 'r', encoding='utf-8') as f:
+            lines = [f.readline() for _ in range(skip_num_lines + 1)]
+
+        # Check number of columns of the first data row after the header part
+        len_data_cols = len(next(csv.reader([lines[skip_num_lines]])))
 
         # Check number of columns of the header part
-        header_cols_df = pd.read_csv(filepath, skiprows=skip_rows_list,
+        header_cols_df = pd.read_csv(io.StringIO(''.join(lines[:skip_num_lines])), skiprows=skip_rows_list,
                                      header=header_rows_list, nrows=0)
         len_header_cols = header_cols_df.columns.size
 
@@ -114,6 +114,35 @@ def log_completion(logger: logging.Logger, operation_name: str, success: bool =
     logger.info(f"{symbol} {operation_name} {status}")
 
 
+class LogBuffer:
+    """Collects log messages, e.g. in a worker process, and logs them later with replay().
+
+    Has the logging methods used in fluxrun, so it can be passed wherever a logger
+    is expected. Buffered messages can be sent back from worker processes and
+    logged in a deterministic order.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def debug(self, msg):
+        self.records.append((logging.DEBUG, msg))
+
+    def info(self, msg):
+        self.records.append((logging.INFO, msg))
+
+    def warning(self, msg):
+        self.records.append((logging.WARNING, msg))
+
+    def error(self, msg):
+        self.records.append((logging.ERROR, msg))
+
+    def replay(self, logger: logging.Logger) -> None:
+        """Log all buffered messages to logger"""
+        for level, msg in self.records:
+            logger.log(level, msg)
+
+
 # def setup_logger(settings_dict):
 #     logfile_name = f"{settings_dict['_run_id']}.log"
 #     logfile_path = settings_dict['_dir_out_run_log'] / logfile_name
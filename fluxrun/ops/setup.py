@@ -21,6 +21,10 @@ def set_outdirs(settings_dict: dict) -> dict:
     settings_dict['_dir_out_run'] = \
         Path(settings_dict['OUTPUT']['OUTDIR']) / _dirname
 
+    # Cache shared by all runs with the same output folder and prefix, created when needed
+    settings_dict['_dir_cache'] = \
+        Path(settings_dict['OUTPUT']['OUTDIR']) / f"{settings_dict['OUTPUT']['OUTDIR_PREFIX']}_cache"
+
     # Logfile
     settings_dict['_dir_out_run_log'] = \
         settings_dict['_dir_out_run'] / '0_log'
@@ -44,6 +48,12 @@ def set_outdirs(settings_dict: dict) -> dict:
         settings_dict['_dir_out_run_eddypro'] / 'results'
     settings_dict['_dir_out_run_plots_summary'] = \
         settings_dict['_dir_out_run'] / '2-1_eddypro_flux_calculations_summary_plots'
+    # Summary statistics table, folder only if the table is written
+    if int(settings_dict['OUTPUT'].get('SUMMARY_STATS', 0)) == 1:
+        settings_dict['_dir_out_run_summary_stats'] = \
+            settings_dict['_dir_out_run'] / '2-2_eddypro_flux_calculations_summary_stats'
+    else:
+        settings_dict.pop('_dir_out_run_summary_stats', None)
 
     return settings_dict
 
@@ -77,6 +87,17 @@ def make_outdirs(settings_dict, logger=None):
     return settings_dict
 
 
+def get_num_workers(num_workers) -> int:
+    """Translate a worker count from the settings to the number of processes to use.
+
+    0 (or an empty value) uses all available CPU cores, 1 runs in the main process.
+    """
+    num_workers = int(num_workers) if num_workers else 0
+    if num_workers <= 0:
+        num_workers = os.cpu_count() or 1
+    return num_workers
+
+
 def generate_run_id():
     """Generate unique id for this run"""
     # script_start_time = time.strftime("%Y-%m-%d %H:%M:%S")
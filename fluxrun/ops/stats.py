@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+
+# Aggregates calculated for each raw data file, in this order
+AGGREGATES = ['count', 'min', 'max', 'mean', 'std', 'median', 'q01', 'q05', 'q95', 'q99']
+AGGREGATES_QUANTILES = {'median': 0.50, 'q01': 0.01, 'q05': 0.05, 'q95': 0.95, 'q99': 0.99}
+
+
+def to_float_array(df: pd.DataFrame) -> np.ndarray:
+    """Return data as 2-D float64 array, non-numeric values and missing values -9999 are NaN"""
+    non_numeric_cols = df.select_dtypes(exclude=np.number).columns
+    if len(non_numeric_cols) > 0:
+        df = df.copy()
+        for col in non_numeric_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    values = df.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    values[values == -9999] = np.nan
+    return values
+
+
+def calc_aggregates_array(values: np.ndarray) -> np.ndarray:
+    """Calculate aggregates for each column of a 2-D array in one vectorized pass.
+
+    Each column is sorted once (NaNs are sorted to the end), the minimum, maximum
+    and all quantiles are then taken from the sorted columns with linear
+    interpolation, the same method that is used by pandas .quantile().
+
+    Returns:
+        Array with one row per column of values and one column per aggregate
+        in AGGREGATES.
+    """
+    num_cols = values.shape[1]
+    count = np.sum(~np.isnan(values), axis=0)
+    aggs = np.full((num_cols, len(AGGREGATES)), np.nan)
+    aggs[:, 0] = count
+
+    has_data = count > 0
+    if not has_data.any():
+        return aggs
+
+    sorted_values = np.sort(values, axis=0)
+    cols = np.arange(num_cols)
+    last = np.maximum(count - 1, 0)
+    aggs[has_data, 1] = sorted_values[0, has_data]
+    aggs[has_data, 2] = sorted_values[last, cols][has_data]
+
+    # Mean and standard deviation (ddof=1) from the NaN-filled sums
+    filled = np.where(np.isnan(values), 0, values)
+    mean = np.divide(filled.sum(axis=0), count, out=np.full(num_cols, np.nan), where=has_data)
+    sq_dev = np.where(np.isnan(values), 0, (values - mean) ** 2).sum(axis=0)
+    std = np.sqrt(np.divide(sq_dev, count - 1, out=np.full(num_cols, np.nan), where=count > 1))
+    aggs[:, 3] = mean
+    aggs[:, 4] = std
+
+    # Quantiles, linear interpolation between the closest ranks
+    for agg, q in AGGREGATES_QUANTILES.items():
+        position = q * last
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        fraction = position - lower
+        lower_values = sorted_values[lower, cols]
+        upper_values = sorted_values[upper, cols]
+        quantile = lower_values + (upper_values - lower_values) * fraction
+        aggs[:, AGGREGATES.index(agg)] = np.where(has_data, quantile, np.nan)
+
+    return aggs
+
+
+def calc_aggregates_row(df: pd.DataFrame) -> tuple:
+    """Calculate aggregates of all columns of one raw data file.
+
+    Returns:
+        Tuple of the sorted columns of df and a flat array with len(AGGREGATES)
+        values per column, see AggregatesCollector.add_row().
+    """
+    df = df.sort_index(axis=1)  # lexsort for better performance
+    aggs = calc_aggregates_array(values=to_float_array(df=df))
+    return tuple(df.columns), aggs.ravel()
+
+
+def calc_file_aggregates(df: pd.DataFrame, index_value) -> pd.DataFrame:
+    """Calculate aggregates of all columns of one raw data file.
+
+    Args:
+        df: Raw data with 3-row MultiIndex header (var, units, instrument).
+        index_value: Index of the returned row, e.g. the file date.
+
+    Returns:
+        One-row dataframe with 4-row MultiIndex header (var, units, instrument,
+        aggregate), variables are sorted, aggregates are in the order of AGGREGATES.
+        Missing values -9999 are ignored, a file without data yields a row of NaNs
+        with count 0.
+    """
+    collector = AggregatesCollector()
+    collector.add(index_value=index_value, df=df)
+    return collector.get()
+
+
+class AggregatesCollector:
+    """Collect aggregates of many raw data files.
+
+    Aggregates of each file are stored as one row in a list. Rows of files with
+    the same columns are stacked into one array and all dataframes are concatenated
+    only once in get(), so time and memory grow linearly with the number of files.
+    """
+
+    def __init__(self):
+        # Column tuple --> (row positions, index values, aggregates rows)
+        self._groups = {}
+        self._num_rows = 0
+
+    def __len__(self):
+        return self._num_rows
+
+    def add(self, index_value, df: pd.DataFrame) -> tuple:
+        """Calculate aggregates of df and add them as new row with index index_value
+
+        Returns:
+            Columns and aggregates row that were added, see add_row().
+        """
+        columns, row = calc_aggregates_row(df=df)
+        self.add_row(index_value=index_value, columns=columns, row=row)
+        return columns, row
+
+    def add_row(self, index_value, columns: tuple, row: np.ndarray):
+        """Add already calculated aggregates, row has len(AGGREGATES) values per column"""
+        positions, index_values, rows = self._groups.setdefault(columns, ([], [], []))
+        positions.append(self._num_rows)
+        index_values.append(index_value)
+        rows.append(row)
+        self._num_rows += 1
+
+    def get(self) -> pd.DataFrame:
+        """Aggregates of all files as dataframe, rows in the order they were added"""
+        if not self._groups:
+            return pd.DataFrame()
+        group_dfs = []
+        all_positions = []
+        for columns, (positions, index_values, rows) in self._groups.items():
+            if columns:
+                agg_columns = pd.MultiIndex.from_tuples([col + (agg,) for col in columns for agg in AGGREGATES])
+            else:
+                agg_columns = pd.MultiIndex.from_arrays([[]] * 4)  # File without any columns
+            group_dfs.append(pd.DataFrame(np.vstack(rows), index=pd.Index(index_values, name='index'),
+                                          columns=agg_columns))
+            all_positions += positions
+        aggs_df = group_dfs[0] if len(group_dfs) == 1 else pd.concat(group_dfs, axis=0)
+        aggs_df = aggs_df.iloc[np.argsort(all_positions, kind='stable')]
+        count_cols = [col for col in aggs_df.columns if col[-1] == 'count']
+        aggs_df[count_cols] = aggs_df[count_cols].fillna(0).astype('int64')
+        return aggs_df
+
+
+class ColumnStats:
+    """Statistics of one time series (e.g. a column of the EddyPro full output file)
+    that are shared by all summary plot panels.
+
+    All statistics are calculated once with vectorized NumPy operations: daily,
+    hourly and half-hourly (fingerprint) means are sums per group calculated with
+    np.bincount, the fingerprint matrix (date x time of day) is a reshape of the
+    half-hourly means.
+
+    Args:
+        y: Series with DatetimeIndex, without missing values.
+    """
+
+    QUANTILES = [0.01, 0.05, 0.50, 0.95, 0.99]
+    NS_PER_DAY = 86_400_000_000_000
+    SLOTS_PER_DAY = 48  # Half-hourly fingerprint
+
+    def __init__(self, y: pd.Series):
+        self.y = y
+        values = y.to_numpy(dtype=np.float64)
+        index = pd.DatetimeIndex(y.index)
+
+        self.count = len(values)
+        self.mean = values.mean() if self.count > 0 else np.nan
+        self.std = values.std(ddof=1) if self.count > 1 else np.nan
+        self.min = values.min() if self.count > 0 else np.nan
+        self.max = values.max() if self.count > 0 else np.nan
+        self.quantiles = pd.Series(np.quantile(values, self.QUANTILES) if self.count > 0 else np.nan,
+                                   index=self.QUANTILES)
+        self.cumsum = y.cumsum()
+
+        # Daily values for all days between first and last day (days without data are NaN)
+        day_ns = index.asi8 // self.NS_PER_DAY * self.NS_PER_DAY
+        first_day_ns = day_ns[0] if self.count > 0 else 0
+        day_ix = (day_ns - first_day_ns) // self.NS_PER_DAY
+        num_days = day_ix[-1] + 1 if self.count > 0 else 0
+        daily_index = pd.DatetimeIndex(first_day_ns + np.arange(num_days) * self.NS_PER_DAY)
+        daily_mean, daily_std, _ = self._group_mean_std(values, day_ix, num_days)
+        self.daily_mean = pd.Series(daily_mean, index=daily_index)
+        self.daily_std = pd.Series(daily_std, index=daily_index)
+
+        # Hourly values, only hours with data
+        hour_ix = index.hour.to_numpy()
+        hourly_mean, hourly_std, hourly_count = self._group_mean_std(values, hour_ix, 24)
+        hours = np.flatnonzero(hourly_count)
+        self.hourly_mean = pd.Series(hourly_mean[hours], index=hours)
+        self.hourly_std = pd.Series(hourly_std[hours], index=hours)
+
+        # Fingerprint, mean per date and half-hour slot, only dates and slots with data
+        slot_ix = index.hour.to_numpy() * 2 + index.minute.to_numpy() // 30
+        cell_ix = day_ix * self.SLOTS_PER_DAY + slot_ix
+        cell_mean, _, cell_count = self._group_mean_std(values, cell_ix, num_days * self.SLOTS_PER_DAY)
+        matrix = cell_mean.reshape(num_days, self.SLOTS_PER_DAY)
+        has_data = cell_count.reshape(num_days, self.SLOTS_PER_DAY) > 0
+        rows, cols = has_data.any(axis=1), has_data.any(axis=0)
+        self.fingerprint = pd.DataFrame(matrix[rows][:, cols],
+                                        index=pd.Index(daily_index[rows].date, name='date'),
+                                        columns=pd.Index(np.flatnonzero(cols), name='slot'))
+
+    @staticmethod
+    def _group_mean_std(values: np.ndarray, group_ix: np.ndarray, num_groups: int) -> tuple:
+        """Mean, standard deviation (ddof=1) and count of values per group"""
+        count = np.bincount(group_ix, minlength=num_groups)
+        mean = np.divide(np.bincount(group_ix, weights=values, minlength=num_groups), count,
+                         out=np.full(num_groups, np.nan), where=count > 0)
+        sq_dev = np.bincount(group_ix, weights=(values - mean[group_ix]) ** 2, minlength=num_groups)
+        std = np.sqrt(np.divide(sq_dev, count - 1, out=np.full(num_groups, np.nan), where=count > 1))
+        return mean, std, count
+
+    def describe(self) -> dict:
+        """Count, mean, standard deviation, minimum and maximum"""
+        return dict(count=self.count, mean=self.mean, std=self.std, min=self.min, max=self.max)
+
+
+def _to_long(wide: pd.DataFrame, stat: str, periods: list) -> pd.DataFrame:
+    """Convert dataframe with one row per period and one column per (var, units) to long format"""
+    num_periods, num_cols = wide.shape
+    return pd.DataFrame({
+        'var': np.repeat(wide.columns.get_level_values(0), num_periods),
+        'units': np.repeat(wide.columns.get_level_values(1), num_periods),
+        'stat': stat,
+        'period': np.tile(periods, num_cols),
+        'value': wide.to_numpy(dtype=np.float64).T.ravel(),
+    })
+
+
+def calc_summary_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Summary statistics of all columns of the EddyPro full output file as one table.
+
+    Uses the same data as the summary plots: missing values (-9999, -6999, inf and
+    non-numeric values) are ignored, columns with a quality flag column
+    (qc_{var}, [#]) only use records with flag 0 or 1. Statistics are calculated
+    for all columns at once, columns without any valid data are not included.
+
+    Args:
+        df: EddyPro full output data with 2-row header (var, units) and DatetimeIndex.
+
+    Returns:
+        Long-format dataframe with columns var, units, stat, period and value.
+        Statistics of the whole period (count, mean, std, min, max, q01 ... q99)
+        have period 'all', daily means (stat daily_mean) have the date as period,
+        the diurnal cycle (stats hourly_mean, hourly_std) the hour, e.g. '13:00'.
+    """
+    values = np.empty(df.shape, dtype=np.float64)
+    for ix, col in enumerate(df.columns):
+        values[:, ix] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    values[(values == -9999) | (values == -6999) | ~np.isfinite(values)] = np.nan
+
+    # Quality control, remove records with flag 2 (or no flag)
+    col_ix = {col: ix for ix, col in enumerate(df.columns)}
+    flagged = [(ix, col_ix[(f"qc_{col[0]}", '[#]')]) for ix, col in enumerate(df.columns)
+               if (f"qc_{col[0]}", '[#]') in col_ix]
+    if flagged:
+        data_ix, qc_ix = map(list, zip(*flagged))
+        with np.errstate(invalid='ignore'):
+            values[:, data_ix] = np.where(values[:, qc_ix] < 2, values[:, data_ix], np.nan)
+
+    data = pd.DataFrame(values, index=df.index, columns=df.columns)
+    data = data.loc[:, data.count() > 0]
+
+    overall = pd.DataFrame({'count': data.count(), 'mean': data.mean(), 'std': data.std(),
+                            'min': data.min(), 'max': data.max()})
+    quantiles = data.quantile(ColumnStats.QUANTILES)
+    for q in ColumnStats.QUANTILES:
+        overall[f"q{q * 100:02.0f}"] = quantiles.loc[q]
+    tables = [_to_long(wide=overall[[stat]].T, stat=stat, periods=['all']) for stat in overall.columns]
+
+    daily = data.groupby(data.index.floor('D')).mean()
+    tables.append(_to_long(wide=daily, stat='daily_mean', periods=daily.index.strftime('%Y-%m-%d')))
+
+    hourly = data.groupby(data.index.hour)
+    hours = [f"{hour:02d}:00" for hour in hourly.mean().index]
+    tables.append(_to_long(wide=hourly.mean(), stat='hourly_mean', periods=hours))
+    tables.append(_to_long(wide=hourly.std(), stat='hourly_std', periods=hours))
+
+    return pd.concat(tables, ignore_index=True)
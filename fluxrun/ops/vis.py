@@ -1,5 +1,7 @@
 import datetime as dt
 import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 import matplotlib.dates as mdates
 import matplotlib.gridspec as gridspec
@@ -10,9 +12,17 @@ from matplotlib import dates
 from matplotlib.ticker import MultipleLocator
 
 try:
-    from .file import ReadEddyProFullOutputFile, read_uncompr_ascii_file
+    from .cache import AggregatesCache
+    from .file import ReadEddyProFullOutputFile, check_all_numeric, read_uncompr_ascii_file, uncompressed_size
+    from .logger import LogBuffer
+    from .setup import get_num_workers
+    from .stats import AggregatesCollector, ColumnStats, calc_aggregates_row
 except ImportError:
-    from file import ReadEddyProFullOutputFile, read_uncompr_ascii_file
+    from cache import AggregatesCache
+    from file import ReadEddyProFullOutputFile, check_all_numeric, read_uncompr_ascii_file, uncompressed_size
+    from logger import LogBuffer
+    from setup import get_num_workers
+    from stats import AggregatesCollector, ColumnStats, calc_aggregates_row
 
 pd.set_option('display.width', 1000)
 pd.set_option('display.max_columns', 15)
@@ -30,10 +40,12 @@ class PlotConfig:
     SUMMARY_HEADING_FONTSIZE = 8
     SUMMARY_LABEL_FONTSIZE = 7
 
-    # Time series
+    # Time series, lines are decimated to the min/max per pixel column
+    TS_MAX_BUCKETS = SUMMARY_FIGSIZE[0] * SUMMARY_DPI
     TS_LINEWIDTH = 0.35
     TS_ALPHA = 0.9
     TS_BAND_ALPHA = 0.7
+    TS_GAP_BREAK_HOURS = 24  # Lines are interrupted at gaps of at least this length
 
     # Daily mean
     DAILY_BAND_ALPHA = 0.18
@@ -121,35 +133,80 @@ def sanitize_y(y):
     return y
 
 
+def decimate_minmax(y: pd.Series, num_buckets: int) -> pd.Series:
+    """Keep only the minimum and maximum of each of num_buckets equally wide time buckets.
+
+    With one bucket per pixel column of the plot, a line drawn from the decimated
+    series looks the same as a line drawn from all points, but the number of
+    vertices does not grow with the length of the record. NaN values (gap breaks,
+    see insert_gap_breaks) are always kept. Series with at most two values per
+    bucket are returned unchanged.
+    """
+    if len(y) <= 2 * num_buckets:
+        return y
+    x = y.index.asi8
+    bucket = ((x - x[0]) / (x[-1] - x[0] + 1) * num_buckets).astype(np.int64)
+    values = y.to_numpy(dtype=np.float64)
+    is_break = np.isnan(values)
+    grouped = pd.Series(values[~is_break], index=np.flatnonzero(~is_break)).groupby(bucket[~is_break])
+    keep = np.unique(np.concatenate([grouped.idxmin().to_numpy(dtype=np.int64),
+                                     grouped.idxmax().to_numpy(dtype=np.int64),
+                                     np.flatnonzero(is_break)]))
+    return y.iloc[keep]
+
+
+def insert_gap_breaks(y: pd.Series, min_gap: pd.Timedelta) -> pd.Series:
+    """Insert a NaN value in the middle of each gap of at least min_gap between records.
+
+    Lines are interrupted at NaN values, so gaps in the record are shown as gaps
+    instead of straight lines between the records before and after the gap. The
+    series keeps its sparse index, only one record is added per gap.
+    """
+    if len(y) < 2:
+        return y
+    gap_ix = np.flatnonzero(np.diff(y.index.asi8) >= min_gap.value)
+    if gap_ix.size == 0:
+        return y
+    gap_start, gap_end = y.index[gap_ix], y.index[gap_ix + 1]
+    breaks = pd.Series(np.nan, index=gap_start + (gap_end - gap_start) / 2, name=y.name)
+    return pd.concat([y, breaks]).sort_index(kind='stable')
+
+
 class PlotEddyProFullOutputFile:
     section_id = "[SUMMARY PLOTS]"
 
-    def __init__(self, file_to_plot, destination_folder, logger):
+    def __init__(self, file_to_plot, destination_folder, logger, num_workers: int = 1, lean_dtypes: bool = False):
+        """
+        Args:
+            num_workers: Number of processes used to render the plots, 1 renders
+                all plots in this process.
+            lean_dtypes: Read the full output file with memory-lean dtypes
+                (see ReadEddyProFullOutputFile).
+        """
         self.file_to_plot = file_to_plot
         self.destination_folder = destination_folder
         self.logger = logger
+        self.num_workers = num_workers
+        self.lean_dtypes = lean_dtypes
 
         self.plot_folder = os.path.join(self.destination_folder)
         self.data_df = pd.DataFrame()
 
     def run(self):
-        self.data_df = ReadEddyProFullOutputFile(filepath=self.file_to_plot).get()
-        self.data_df = self.sanitize_daterange(df=self.data_df.copy())
+        self.data_df = ReadEddyProFullOutputFile(filepath=self.file_to_plot, lean_dtypes=self.lean_dtypes).get()
+        self.data_df = self.sanitize_daterange(df=self.data_df)
         columns_names, columns_count = self.col_info()
         self.plot_full_output(columns_count, columns_names)
 
     def sanitize_daterange(self, df):
-        # look at what date range of 30min data we have
-        first_date = df.index[0]  # first entry
-        last_date = df.index[-1]  # last entry
-        if last_date.day - first_date.day < 5:  # if we have less than 5 days of data add dates to avoid problems with results plotting
-            last_date = last_date + pd.offsets.Day(20)
-            self.logger.debug(f"Date range: {first_date} to {last_date} (extended +20 days for plotting)")
-        else:
-            self.logger.debug(f"Date range: {first_date} to {last_date}")
-        # generate continuous date range and re-index data
-        filled_date_range = pd.date_range(first_date, last_date, freq='30min')
-        df = df.reindex(filled_date_range, fill_value=-9999)  # apply new continuous index to data
+        """Log the date range and make sure the records are in time order.
+
+        The index is not reindexed to a continuous range, gaps are shown in the
+        time series by insert_gap_breaks.
+        """
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind='stable')
+        self.logger.debug(f"Date range: {df.index[0]} to {df.index[-1]}")
         return df
 
     def col_info(self):
@@ -173,16 +230,19 @@ class PlotEddyProFullOutputFile:
         qc_col = (f"qc_{col[0]}", '[#]')
         quality_controlled = False
         if qc_col in columns_names:
-            qc = self.data_df[qc_col] < 2  # qc = quality control flags, 0 = very good, 1 = OK
+            qc = (self.data_df[qc_col] < 2).fillna(False)  # qc = quality control flags, 0 = very good, 1 = OK
             y = y[qc]
             quality_controlled = True
 
         return y, quality_controlled if y.empty is False else (None, None)
 
-    def _plot_time_series(self, ax, y, quantiles, units, var, heading_size, label_size):
+    def _plot_time_series(self, ax, stats, units, var, heading_size, label_size):
         """Plot time series with percentile bands."""
-        ax.fill_between(y.index, quantiles[0.05], quantiles[0.95],
+        # Band between constant percentiles only needs the first and last date
+        ax.fill_between(stats.y.index[[0, -1]], stats.quantiles[0.05], stats.quantiles[0.95],
                         color=_P['ts_band'], alpha=PlotConfig.TS_BAND_ALPHA, label='5–95th pct', zorder=1)
+        y = insert_gap_breaks(y=stats.y, min_gap=pd.Timedelta(hours=PlotConfig.TS_GAP_BREAK_HOURS))
+        y = decimate_minmax(y=y, num_buckets=PlotConfig.TS_MAX_BUCKETS)
         ax.plot(y.index, y, color=_P['ts'], linewidth=PlotConfig.TS_LINEWIDTH, alpha=PlotConfig.TS_ALPHA, zorder=2)
         _style_ax(ax)
         ax.set_xlabel("date", size=label_size)
@@ -191,11 +251,10 @@ class PlotEddyProFullOutputFile:
                      size=heading_size, fontweight='bold', color=_P['text'], loc='left', pad=6)
         ax.xaxis.set_major_formatter(dates.DateFormatter("%d %b"))
 
-    def _plot_daily_mean(self, ax, y, quantiles, units, var, heading_size, label_size, q_min, q_max):
+    def _plot_daily_mean(self, ax, stats, units, var, heading_size, label_size, q_min, q_max):
         """Plot daily mean with standard deviation."""
-        daily_resampled = y.resample('D')
-        daily_avg = daily_resampled.mean()
-        daily_std = daily_resampled.std()
+        daily_avg = stats.daily_mean
+        daily_std = stats.daily_std
         ax.fill_between(daily_avg.index, daily_avg - daily_std, daily_avg + daily_std,
                         color=_P['daily'], alpha=PlotConfig.DAILY_BAND_ALPHA, zorder=1)
         ax.scatter(daily_avg.index, daily_avg,
@@ -209,10 +268,10 @@ class PlotEddyProFullOutputFile:
         ax.xaxis.set_major_formatter(dates.DateFormatter("%d %b"))
         ax.set_ylim(q_min, q_max)
 
-    def _plot_histogram(self, ax, y, quantiles, units, var, heading_size, label_size, q_min, q_max):
+    def _plot_histogram(self, ax, stats, units, var, heading_size, label_size, q_min, q_max):
         """Plot histogram of data distribution."""
         try:
-            ax.hist(y, bins=PlotConfig.HIST_BINS, range=(q_min, q_max),
+            ax.hist(stats.y, bins=PlotConfig.HIST_BINS, range=(q_min, q_max),
                     color=_P['hist'], edgecolor='white', linewidth=0.3, alpha=PlotConfig.HIST_ALPHA)
             _style_ax(ax)
             ax.set_xlabel(units, size=label_size)
@@ -222,11 +281,11 @@ class PlotEddyProFullOutputFile:
         except ValueError as e:
             self.logger.error(f"ERROR DURING HISTOGRAM PLOTTING: {e}")
 
-    def _plot_cumulative(self, ax, y, units, var, heading_size, label_size, q_min, q_max):
+    def _plot_cumulative(self, ax, stats, units, var, heading_size, label_size, q_min, q_max):
         """Plot cumulative sum."""
-        cumsum = y.cumsum()
-        ax.fill_between(y.index, cumsum, alpha=PlotConfig.CUMUL_BAND_ALPHA, color=_P['cumul'], zorder=1)
-        ax.plot(y.index, cumsum, color=_P['cumul'], linewidth=PlotConfig.CUMUL_LINEWIDTH, zorder=2)
+        cumsum = decimate_minmax(y=stats.cumsum, num_buckets=PlotConfig.TS_MAX_BUCKETS)
+        ax.fill_between(cumsum.index, cumsum, alpha=PlotConfig.CUMUL_BAND_ALPHA, color=_P['cumul'], zorder=1)
+        ax.plot(cumsum.index, cumsum, color=_P['cumul'], linewidth=PlotConfig.CUMUL_LINEWIDTH, zorder=2)
         ax.axhline(0, color=_P['zero'], linewidth=0.7, alpha=0.6)
         _style_ax(ax)
         ax.set_xlabel("date", size=label_size)
@@ -235,11 +294,10 @@ class PlotEddyProFullOutputFile:
                      size=heading_size, fontweight='bold', color=_P['text'], loc='left', pad=6)
         ax.xaxis.set_major_formatter(dates.DateFormatter("%d %b"))
 
-    def _plot_diurnal(self, ax, y, units, var, heading_size, label_size):
+    def _plot_diurnal(self, ax, stats, units, var, heading_size, label_size):
         """Plot diurnal (hourly) cycle."""
-        hourly_resampled = y.groupby(y.index.hour)
-        hourly_avg = hourly_resampled.mean()
-        hourly_std = hourly_resampled.std()
+        hourly_avg = stats.hourly_mean
+        hourly_std = stats.hourly_std
         ax.fill_between(hourly_avg.index, hourly_avg - hourly_std, hourly_avg + hourly_std,
                         color=_P['diurnal_band'], alpha=PlotConfig.DIURNAL_BAND_ALPHA, zorder=1)
         ax.plot(hourly_avg.index, hourly_avg, color=_P['diurnal'], linewidth=PlotConfig.DIURNAL_LINEWIDTH, zorder=2)
@@ -252,12 +310,9 @@ class PlotEddyProFullOutputFile:
         ax.set_xlim(0, PlotConfig.DIURNAL_MAX_HOUR)
         ax.xaxis.set_major_locator(MultipleLocator(PlotConfig.DIURNAL_HOUR_LOCATOR))
 
-    def _plot_fingerprint(self, ax_fingerprint, y, quantiles, units, var, heading_size, label_size, fig, q_min, q_max):
+    def _plot_fingerprint(self, ax_fingerprint, stats, units, var, heading_size, label_size, fig, q_min, q_max):
         """Plot fingerprint heatmap (time-of-day vs date)."""
-        fingerprint_df = y.copy().to_frame(name='v')
-        fingerprint_df['date'] = fingerprint_df.index.date
-        fingerprint_df['slot'] = fingerprint_df.index.hour * 2 + fingerprint_df.index.minute // 30
-        fingerprint_pivot = fingerprint_df.pivot_table(index='date', columns='slot', values='v', aggfunc='mean')
+        fingerprint_pivot = stats.fingerprint
 
         im = ax_fingerprint.pcolormesh(
             np.arange(fingerprint_pivot.shape[1] + 1),
@@ -292,9 +347,10 @@ class PlotEddyProFullOutputFile:
                                size=heading_size, fontweight='bold', color=_P['text'], loc='left', pad=6)
         _style_ax(ax_fingerprint)
 
-    def _create_stats_box(self, fig, y, quantiles, var, quality_controlled, heading_size, label_size):
+    def _create_stats_box(self, fig, stats, var, quality_controlled, heading_size, label_size):
         """Create statistics box with summary statistics."""
-        info_dict = y.describe()
+        info_dict = stats.describe()
+        quantiles = stats.quantiles
         lines = [
             f"n      {info_dict['count']:.0f}",
             f"mean   {info_dict['mean']:.4g}",
@@ -318,64 +374,105 @@ class PlotEddyProFullOutputFile:
                                 edgecolor=_P['spine'], linewidth=0.8))
 
     def plot_full_output(self, columns_count, columns_names):
-        """Assemble summary plots for each column."""
+        """Assemble summary plots for each column.
+
+        With num_workers > 1, figures are rendered in a process pool, each worker
+        receives only the prepared data of one column.
+        """
         self.logger.info(f"Generating plots for {columns_count} columns...")
 
-        for ix, col in enumerate(self.data_df.columns):
-            var = col[0]
-            units = col[1]
-
-            self.logger.debug(f"Processing column {ix + 1}/{columns_count}: {var}")
-
-            # Prepare and validate data
-            y, quality_controlled = self._prepare_plot_data(col, columns_names)
-            if y is None:
-                continue
-
-            # Create figure and setup
-            fig = plt.figure(figsize=PlotConfig.SUMMARY_FIGSIZE, dpi=PlotConfig.SUMMARY_DPI, facecolor='white')
-            fig.suptitle(f"{var}  {units}", fontsize=18, fontweight='bold',
-                         color=_P['text'], x=0.02, ha='left', va='top', y=0.99)
-
-            heading_size = PlotConfig.SUMMARY_HEADING_FONTSIZE
-            label_size = PlotConfig.SUMMARY_LABEL_FONTSIZE
-            quantiles = y.quantile([0.01, 0.05, 0.50, 0.95, 0.99])
-            q_min, q_max = quantiles[0.01], quantiles[0.99]
-
-            # Skip columns with invalid quantiles (all NaN or Inf values)
-            if np.isnan(q_min) or np.isnan(q_max) or np.isinf(q_min) or np.isinf(q_max):
-                self.logger.debug(f"Skipping {var} — no valid data for plotting (all NaN or Inf)")
-                continue
-
-            # Create subplot axes
-            ax1 = plt.subplot2grid((6, 4), (0, 0), colspan=4, rowspan=2)
-            ax2 = plt.subplot2grid((6, 4), (3, 0), colspan=2)
-            ax4 = plt.subplot2grid((6, 4), (2, 0), colspan=2)
-            ax5 = plt.subplot2grid((6, 4), (2, 2), colspan=2)
-            ax6 = plt.subplot2grid((6, 4), (3, 2), colspan=1)
-            ax_fingerprint = plt.subplot2grid((6, 4), (4, 0), colspan=4, rowspan=2)
-
-            # Generate all plots using helper methods
-            self._plot_time_series(ax1, y, quantiles, units, var, heading_size, label_size)
-            ax1.set_ylim(q_min, q_max)
-            self._plot_daily_mean(ax4, y, quantiles, units, var, heading_size, label_size, q_min, q_max)
-            self._plot_histogram(ax2, y, quantiles, units, var, heading_size, label_size, q_min, q_max)
-            self._plot_cumulative(ax5, y, units, var, heading_size, label_size, q_min, q_max)
-            self._plot_diurnal(ax6, y, units, var, heading_size, label_size)
-            self._create_stats_box(fig, y, quantiles, var, quality_controlled, heading_size, label_size)
-            self._plot_fingerprint(ax_fingerprint, y, quantiles, units, var, heading_size, label_size, fig, q_min, q_max)
-
-            # Save figure
-            plt.tight_layout(pad=1.2, rect=[0, 0, 1, 0.97])
-            plot_name = f"{ix}_{var}_{units}"
-            plot_name = plot_name.replace('*', 'star').replace('/', '_over_')
-            plot_path = os.path.join(self.plot_folder, plot_name)
-            self.logger.debug(f"Saving plot: {plot_path}.png")
-            plt.savefig(plot_path + '.png', dpi=PlotConfig.SUMMARY_DPI, facecolor='white')
-            plt.close(fig)
+        executor = None
+        futures = []
+        if self.num_workers > 1:
+            self.logger.info(f"Rendering summary plots using {self.num_workers} workers ...")
+            executor = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_plot_worker)
+
+        try:
+            for ix, col in enumerate(self.data_df.columns):
+                var = col[0]
+                units = col[1]
+
+                self.logger.debug(f"Processing column {ix + 1}/{columns_count}: {var}")
+
+                # Prepare and validate data
+                y, quality_controlled = self._prepare_plot_data(col, columns_names)
+                if y is None:
+                    continue
+
+                # Statistics shared by all panels
+                stats = ColumnStats(y=y)
+
+                if executor is not None:
+                    futures.append(executor.submit(_plot_full_output_column, self.plot_folder,
+                                                   ix, var, units, stats, quality_controlled))
+                else:
+                    self.plot_column(ix=ix, var=var, units=units, stats=stats, quality_controlled=quality_controlled)
+
+            # Log messages of the workers in column order
+            for future in futures:
+                future.result().replay(logger=self.logger)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
         self.logger.info("Summary plots generation complete")
 
+    def plot_column(self, ix, var, units, stats, quality_controlled):
+        """Create and save summary plot of one column from its stats.ColumnStats"""
+        heading_size = PlotConfig.SUMMARY_HEADING_FONTSIZE
+        label_size = PlotConfig.SUMMARY_LABEL_FONTSIZE
+        q_min, q_max = stats.quantiles[0.01], stats.quantiles[0.99]
+
+        # Skip columns with invalid quantiles (all NaN or Inf values)
+        if np.isnan(q_min) or np.isnan(q_max) or np.isinf(q_min) or np.isinf(q_max):
+            self.logger.debug(f"Skipping {var} — no valid data for plotting (all NaN or Inf)")
+            return
+
+        # Create figure and setup
+        fig = plt.figure(figsize=PlotConfig.SUMMARY_FIGSIZE, dpi=PlotConfig.SUMMARY_DPI, facecolor='white')
+        fig.suptitle(f"{var}  {units}", fontsize=18, fontweight='bold',
+                     color=_P['text'], x=0.02, ha='left', va='top', y=0.99)
+
+        # Create subplot axes
+        ax1 = plt.subplot2grid((6, 4), (0, 0), colspan=4, rowspan=2)
+        ax2 = plt.subplot2grid((6, 4), (3, 0), colspan=2)
+        ax4 = plt.subplot2grid((6, 4), (2, 0), colspan=2)
+        ax5 = plt.subplot2grid((6, 4), (2, 2), colspan=2)
+        ax6 = plt.subplot2grid((6, 4), (3, 2), colspan=1)
+        ax_fingerprint = plt.subplot2grid((6, 4), (4, 0), colspan=4, rowspan=2)
+
+        # Generate all plots using helper methods
+        self._plot_time_series(ax1, stats, units, var, heading_size, label_size)
+        ax1.set_ylim(q_min, q_max)
+        self._plot_daily_mean(ax4, stats, units, var, heading_size, label_size, q_min, q_max)
+        self._plot_histogram(ax2, stats, units, var, heading_size, label_size, q_min, q_max)
+        self._plot_cumulative(ax5, stats, units, var, heading_size, label_size, q_min, q_max)
+        self._plot_diurnal(ax6, stats, units, var, heading_size, label_size)
+        self._create_stats_box(fig, stats, var, quality_controlled, heading_size, label_size)
+        self._plot_fingerprint(ax_fingerprint, stats, units, var, heading_size, label_size, fig, q_min, q_max)
+
+        # Save figure
+        plt.tight_layout(pad=1.2, rect=[0, 0, 1, 0.97])
+        plot_name = f"{ix}_{var}_{units}"
+        plot_name = plot_name.replace('*', 'star').replace('/', '_over_')
+        plot_path = os.path.join(self.plot_folder, plot_name)
+        self.logger.debug(f"Saving plot: {plot_path}.png")
+        plt.savefig(plot_path + '.png', dpi=PlotConfig.SUMMARY_DPI, facecolor='white')
+        plt.close(fig)
+
+
+def _init_plot_worker():
+    """Use the non-interactive Agg backend in plot worker processes"""
+    plt.switch_backend('Agg')
+
+
+def _plot_full_output_column(plot_folder, ix, var, units, stats, quality_controlled) -> LogBuffer:
+    """Render summary plot of one column in a worker process, returns the log messages"""
+    log = LogBuffer()
+    plotter = PlotEddyProFullOutputFile(file_to_plot=None, destination_folder=plot_folder, logger=log)
+    plotter.plot_column(ix=ix, var=var, units=units, stats=stats, quality_controlled=quality_controlled)
+    return log
+
 
 def availability_rawdata(rawdata_found_files_dict, rawdata_file_datefrmt, outdir, logger):
     """
@@ -394,7 +491,7 @@ def availability_rawdata(rawdata_found_files_dict, rawdata_file_datefrmt, outdir
         records.append({
             'datetime': rawdata_filebin_filedate,
             'date': rawdata_filebin_filedate.date(),
-            'filesize': os.path.getsize(rawdata_filepath) / 1_000_000,  # in MB
+            'filesize': uncompressed_size(rawdata_filepath) / 1_000_000,  # in MB, also for .gz files
         })
     plot_df = pd.DataFrame(records).set_index('datetime')
 
@@ -479,110 +576,231 @@ def _default_format(ax, fontsize=12, label_color='black',
         ax.set_ylabel(f'{txt_ylabel}', color=label_color, fontsize=fontsize, fontweight='bold')
 
 
+class AggregatesFigure:
+    """Figure for raw data aggregates plots that is reused for all variables.
+
+    Figure, axes, artists and legend are created once, plot() then only updates
+    the data of the artists, the labels and the axis limits before saving.
+    """
+
+    def __init__(self):
+        gs = gridspec.GridSpec(2, 1, hspace=PlotConfig.AGG_GRID_HSPACE, left=PlotConfig.AGG_GRID_LEFT,
+                               right=PlotConfig.AGG_GRID_RIGHT, top=PlotConfig.AGG_GRID_TOP,
+                               bottom=PlotConfig.AGG_GRID_BOTTOM)
+        self.fig = plt.Figure(facecolor='white', figsize=PlotConfig.AGG_FIGSIZE)
+        self.ax1 = self.fig.add_subplot(gs[0])
+        self.ax2 = self.fig.add_subplot(gs[1])
+        ax1, ax2 = self.ax1, self.ax2
+        ax1.xaxis_date()
+        ax2.xaxis_date()
+
+        # Aggregated data with percentile bands, median, and mean ± std
+        self.band = ax1.fill_between(x=[], y1=[], y2=[],
+                                     alpha=0.25, color=_P['agg_band'], label='5–95th percentile', zorder=1)
+        self.median, = ax1.plot([], [],
+                                alpha=0.8, color=_P['agg_med'], linewidth=0.8, label='median', zorder=3)
+        errorbar = ax1.errorbar([], [], [],
+                                marker='o', mec=_P['daily'], mfc='none', color=_P['daily'],
+                                capsize=0, label='mean ± std', alpha=0.4, markersize=3,
+                                linewidth=0, elinewidth=1.2, zorder=2)
+        self.mean = errorbar.lines[0]
+        self.std = errorbar.lines[2][0]
+
+        # Count
+        self.count_band = ax2.fill_between([], [], alpha=0.3, color=_P['count'], zorder=1)
+        self.count, = ax2.plot([], [], alpha=0.9, color=_P['count'], linewidth=0.8, zorder=2)
+
+        # Axes styling, labels, and legend
+        self.title = ax1.text(0.005, 0.97, "",
+                              transform=ax1.transAxes, horizontalalignment='left',
+                              verticalalignment='top', size=PlotConfig.AGG_TEXT_SIZE, color=_P['text'],
+                              fontweight='bold', backgroundcolor='none', zorder=100)
+        _style_ax(ax1, fontsize=PlotConfig.AGG_FONTSIZE)
+        _style_ax(ax2, fontsize=PlotConfig.AGG_FONTSIZE)
+        ax1.set_ylabel("", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
+        ax2.set_ylabel("count", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
+        ax2.set_xlabel("file date", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
+        font = {'family': 'sans-serif', 'size': 10}
+        ax1.legend(frameon=False, loc='upper right', prop=font).set_zorder(100)
+
+    def plot(self, var_df, var, outdir):
+        """Update figure with the aggregates of variable var and save it to outdir"""
+        x = mdates.date2num(var_df.index)
+        q05, q95 = var_df['q05'].to_numpy(), var_df['q95'].to_numpy()
+        median = var_df['median'].to_numpy()
+        mean, std = var_df['mean'].to_numpy(), var_df['std'].to_numpy()
+        count = var_df['count'].to_numpy()
+
+        self.band.set_data(x, q05, q95)
+        self.median.set_data(x, median)
+        self.mean.set_data(x, mean)
+        self.std.set_segments(np.stack([np.column_stack([x, mean - std]),
+                                        np.column_stack([x, mean + std])], axis=1))
+        self.count_band.set_data(x, 0, count)
+        self.count.set_data(x, count)
+
+        self._autoscale(self.ax1, x, q05, q95, median, mean - std, mean + std)
+        self._autoscale(self.ax2, x, np.zeros_like(count), count)
+        try:
+            self.ax1.set_ylim(var_df['q01'].min(), var_df['q99'].max())
+        except ValueError:
+            pass
+
+        self.title.set_text(f"{var[0]}  {var[1]}  {var[2]}")
+        self.ax1.set_ylabel(f"{var[0]}  {var[1]}")
+
+        # Save figure
+        outname = f"{var[0]}_{var[1]}_{var[2]}".replace(':', '_').replace('/', '_over_')
+        outfile = Path(outdir) / outname
+        self.fig.savefig(f"{outfile}.png", format='png', bbox_inches='tight', facecolor='w',
+                         transparent=True, dpi=150)
+
+    @staticmethod
+    def _autoscale(ax, x, *ys):
+        """Set data limits of ax to the new data (NaNs are ignored) and autoscale both axes"""
+        if not any(np.isfinite(y).any() for y in ys):
+            ys = (np.zeros_like(x),)  # No data, center y-axis around zero
+        ax.ignore_existing_data_limits = True
+        for y in ys:
+            ax.update_datalim(np.column_stack([x, y]))
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+
+
+# Figure reused by _plot_aggregates_var, created on first use in each process
+_AGGREGATES_FIGURE = None
+
+
+def _plot_aggregates_var(var_df, var, outdir):
+    """Plot aggregates of one variable in a worker process, the figure is reused
+    for all variables plotted by this process"""
+    global _AGGREGATES_FIGURE
+    if _AGGREGATES_FIGURE is None:
+        _AGGREGATES_FIGURE = AggregatesFigure()
+    _AGGREGATES_FIGURE.plot(var_df=var_df, var=var, outdir=outdir)
+
+
 class PlotRawDataFilesAggregates:
     section_id = "[PLOT RAW DATA FILE AGGREGATES]"
 
-    def __init__(self, rawdata_found_files_dict, settings_dict, logger, rawdata_file_datefrmt):
+    def __init__(self, rawdata_found_files_dict, settings_dict, logger, rawdata_file_datefrmt, collect: bool = True):
+        """
+        Args:
+            collect: If True, read all files in rawdata_found_files_dict and plot their
+                aggregates. If False, files are added one by one with add_file() while
+                they are read elsewhere (e.g. during validation), plot() creates the plots.
+        """
         self.rawdata_found_files_dict = rawdata_found_files_dict
         self.settings = settings_dict
         self.logger = logger
         self.rawdata_file_datefrmt = rawdata_file_datefrmt
 
-        self.collect_aggs()
+        self.aggregates = AggregatesCollector()
+        self.filecounter = 0
+
+        # Aggregates of unchanged files are taken from previous runs
+        self.cache = None
+        self.num_cached = 0
+        if int(self.settings['RAWDATA'].get('AGGREGATES_CACHE', 0)) == 1:
+            self.cache = AggregatesCache(
+                filepath=Path(self.settings['_dir_cache']) / 'rawdata_aggregates.sqlite',
+                horizon_days=int(self.settings['RAWDATA'].get('AGGREGATES_CACHE_HORIZON_DAYS', 90)))
+            self.logger.info(f"{self.section_id} Using aggregates cache {self.cache.filepath} "
+                             f"({self.cache.num_evicted} entries older than the cache horizon removed)")
+
+        if collect:
+            self.collect_aggs()
 
     def collect_aggs(self):
         """Loop"""
-        filecounter = 0
-        stats_coll_df = pd.DataFrame()
-        num_files = len(self.rawdata_found_files_dict)
         for fid, filepath in self.rawdata_found_files_dict.items():
             try:
-                filecounter += 1
-                self.file_header_for_log(fid=fid, num_files=num_files, filecounter=filecounter)
-                rawdata_filedate = self.get_filedate(fid)
+                cached = self.get_cached_file(fid=fid, filepath=filepath)
+                if cached is not None:
+                    self.add_cached_file(fid=fid, columns=cached[0], row=cached[1])
+                    continue
                 rawdata_df = read_uncompr_ascii_file(
                     settings=self.settings,
                     filepath=filepath,
                     logger=self.logger,
                     section_id=self.section_id
                 )
-                stats_coll_df = self.calc_rawdata_stats(rawdata_df=rawdata_df,
-                                                        rawdata_filedate=rawdata_filedate,
-                                                        stats_coll_df=stats_coll_df,
-                                                        filecounter=filecounter)
+                self.add_file(fid=fid, rawdata_df=rawdata_df, filepath=filepath,
+                              all_numeric=check_all_numeric(df=rawdata_df))
             except Exception as e:
                 self.logger.error(e)
                 raise Exception(f"ERROR IN FILE {filepath}: {e}")
 
-        self.make_plot(df=stats_coll_df,
+        self.plot()
+
+    def add_file(self, fid, rawdata_df, filepath=None, all_numeric: bool = False):
+        """Add aggregates of one raw data file to the stats collection
+
+        Args:
+            filepath: If given, the aggregates are also stored in the aggregates cache.
+            all_numeric: Whether all data in the file are numeric, stored in the cache.
+        """
+        # Vectorized aggregates, missing values -9999 are ignored, no data yields a row of NaNs
+        columns, row = calc_aggregates_row(df=rawdata_df)
+        self.add_file_row(fid=fid, columns=columns, row=row, filepath=filepath, all_numeric=all_numeric)
+
+    def add_file_row(self, fid, columns: tuple, row, filepath=None, all_numeric: bool = False):
+        """Add already calculated aggregates of one raw data file, e.g. calculated in a
+        worker process with stats.calc_aggregates_row(), see add_file() for args"""
+        self.filecounter += 1
+        self.file_header_for_log(fid=fid, num_files=len(self.rawdata_found_files_dict), filecounter=self.filecounter)
+        rawdata_filedate = self.get_filedate(fid)
+        self.aggregates.add_row(index_value=rawdata_filedate, columns=columns, row=row)
+        if self.cache is not None and filepath is not None:
+            self.cache.put(filename=fid, filepath=filepath, filedate=rawdata_filedate,
+                           header_format=self.settings['RAWDATA']['HEADER_FORMAT'],
+                           columns=columns, row=row, all_numeric=all_numeric)
+
+    def get_cached_file(self, fid, filepath):
+        """Aggregates of an unchanged file from the aggregates cache
+
+        Returns:
+            Tuple (columns, aggregates row) if the file is in the cache and contained
+            only numeric data when it was cached, otherwise the file has to be read
+            (and validated) again and None is returned.
+        """
+        if self.cache is None:
+            return None
+        cached = self.cache.get(filename=fid, filepath=filepath,
+                                header_format=self.settings['RAWDATA']['HEADER_FORMAT'])
+        if cached is None:
+            return None
+        columns, row, all_numeric = cached
+        if not all_numeric:
+            return None
+        return columns, row
+
+    def add_cached_file(self, fid, columns: tuple, row):
+        """Add aggregates of an unchanged file that were returned by get_cached_file()"""
+        self.filecounter += 1
+        self.file_header_for_log(fid=fid, num_files=len(self.rawdata_found_files_dict), filecounter=self.filecounter)
+        self.aggregates.add_row(index_value=self.get_filedate(fid), columns=columns, row=row)
+        self.num_cached += 1
+
+    def plot(self):
+        if self.cache is not None:
+            self.logger.info(f"{self.section_id} Aggregates cache: {self.num_cached} files unchanged "
+                             f"since previous runs, {self.filecounter - self.num_cached} files (re-)calculated")
+            self.cache.close()
+            self.cache = None
+        self.make_plot(df=self.aggregates.get(),
                        outdir=self.settings['_dir_out_run_plots_aggregates_rawdata'])
 
     def file_header_for_log(self, fid, num_files, filecounter):
         self.logger.debug(f"Processing file {filecounter}/{num_files}: {fid}")
 
-    def calc_rawdata_stats(self, rawdata_df, stats_coll_df, rawdata_filedate, filecounter):
-        """Calculate stats for raw data"""
-
-        if rawdata_df.empty:
-            # In case there are no data, create df with one row of NaNs
-            rawdata_df = pd.DataFrame(index=[0], columns=rawdata_df.columns)
-
-        # Replace missing values -9999 with NaNs for correct stats calcs
-        rawdata_df.replace(-9999, np.nan, inplace=True)
-
-        rawdata_df['index'] = rawdata_filedate
-        rawdata_df.sort_index(axis=1, inplace=True)  # lexsort for better performance
-        aggs = ['count', 'min', 'max', 'mean', 'std', 'median', self.q01, self.q05, self.q95, self.q99]
-        rawdata_df = rawdata_df.groupby('index').agg(aggs)
-
-        # First file inits stats collection
-        if filecounter == 1:
-            stats_coll_df = rawdata_df.copy()
-        else:
-            stats_coll_df = pd.concat([stats_coll_df, rawdata_df], axis=0)
-
-        return stats_coll_df
-
-    def _plot_aggregate_data(self, ax, var_df, var):
-        """Plot aggregated data with percentile bands, median, and mean ± std."""
-        ax.fill_between(x=var_df.index, y1=var_df['q05'], y2=var_df['q95'],
-                        alpha=0.25, color=_P['agg_band'], label='5–95th percentile', zorder=1)
-        ax.plot(var_df.index, var_df['median'],
-                alpha=0.8, color=_P['agg_med'], linewidth=0.8, label='median', zorder=3)
-        ax.errorbar(var_df.index, var_df['mean'], var_df['std'],
-                    marker='o', mec=_P['daily'], mfc='none', color=_P['daily'],
-                    capsize=0, label='mean ± std', alpha=0.4, markersize=3,
-                    linewidth=0, elinewidth=1.2, zorder=2)
-        try:
-            ax.set_ylim(var_df['q01'].min(), var_df['q99'].max())
-        except ValueError:
-            pass
-
-    def _plot_aggregate_count(self, ax, var_df):
-        """Plot count data."""
-        ax.fill_between(var_df.index, var_df['count'],
-                        alpha=0.3, color=_P['count'], zorder=1)
-        ax.plot(var_df.index, var_df['count'],
-                alpha=0.9, color=_P['count'], linewidth=0.8, zorder=2)
-
-    def _format_aggregate_axes(self, ax1, ax2, var):
-        """Format axes styling, labels, and legend."""
-        ax1.text(0.005, 0.97, f"{var[0]}  {var[1]}  {var[2]}",
-                 transform=ax1.transAxes, horizontalalignment='left',
-                 verticalalignment='top', size=PlotConfig.AGG_TEXT_SIZE, color=_P['text'],
-                 fontweight='bold', backgroundcolor='none', zorder=100)
-
-        _style_ax(ax1, fontsize=PlotConfig.AGG_FONTSIZE)
-        _style_ax(ax2, fontsize=PlotConfig.AGG_FONTSIZE)
-        ax1.set_ylabel(f"{var[0]}  {var[1]}", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
-        ax2.set_ylabel("count", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
-        ax2.set_xlabel("file date", color=_P['subtext'], fontsize=PlotConfig.AGG_FONTSIZE)
-
-        font = {'family': 'sans-serif', 'size': 10}
-        ax1.legend(frameon=False, loc='upper right', prop=font).set_zorder(100)
-
     def make_plot(self, df, outdir):
-        """Plot aggregated values for each file."""
+        """Plot aggregated values for each file.
+
+        One figure is reused for all variables, only the plotted data and labels
+        are updated. With OUTPUT: PLOT_WORKERS > 1 variables are distributed to
+        worker processes, each with its own figure.
+        """
         self.logger.debug("Generating aggregate plots...")
         df.replace(-9999, np.nan, inplace=True)
         df.sort_index(axis=1, inplace=True)  # lexsort for better performance
@@ -592,29 +810,23 @@ class PlotRawDataFilesAggregates:
         variables = list(zip(df.columns.get_level_values(0),
                          df.columns.get_level_values(1),
                          df.columns.get_level_values(2)))
-        variables = set(variables)
-
+        variables = list(dict.fromkeys(variables))
+
+        num_workers = get_num_workers(self.settings['OUTPUT'].get('PLOT_WORKERS', 1))
+        if num_workers > 1 and len(variables) > 1:
+            self.logger.debug(f"Rendering aggregate plots using {num_workers} workers ...")
+            with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_plot_worker) as executor:
+                futures = [executor.submit(_plot_aggregates_var, df[var], var, outdir) for var in variables]
+                for var, future in zip(variables, futures):
+                    future.result()
+                    self.logger.debug(f"Plotted {var[0]}")
+            return
+
+        figure = AggregatesFigure()
         for var in variables:
             self.logger.debug(f"Plotting {var[0]}")
-            var_df = df[var].copy()
-
-            # Create figure with grid layout
-            gs = gridspec.GridSpec(2, 1, hspace=PlotConfig.AGG_GRID_HSPACE, left=PlotConfig.AGG_GRID_LEFT,
-                                  right=PlotConfig.AGG_GRID_RIGHT, top=PlotConfig.AGG_GRID_TOP, bottom=PlotConfig.AGG_GRID_BOTTOM)
-            fig = plt.Figure(facecolor='white', figsize=PlotConfig.AGG_FIGSIZE)
-            ax1 = fig.add_subplot(gs[0])
-            ax2 = fig.add_subplot(gs[1])
-
-            # Generate plots
-            self._plot_aggregate_data(ax1, var_df, var)
-            self._plot_aggregate_count(ax2, var_df)
-            self._format_aggregate_axes(ax1, ax2, var)
-
-            # Save figure
-            outname = f"{var[0]}_{var[1]}_{var[2]}".replace(':', '_')
-            outfile = outdir / outname
-            fig.savefig(f"{outfile}.png", format='png', bbox_inches='tight', facecolor='w',
-                        transparent=True, dpi=150)
+            figure.plot(var_df=df[var], var=var, outdir=outdir)
+        plt.close(figure.fig)
 
     def get_filedate(self, fid):
         """Get filedate from filename"""
@@ -622,23 +834,10 @@ class PlotRawDataFilesAggregates:
         self.logger.debug(f"Filedate: {rawdata_filedate}")
         return rawdata_filedate
 
-    def q01(self, x):
-        return x.quantile(0.01)
-
-    def q05(self, x):
-        return x.quantile(0.05)
-
-    def q95(self, x):
-        return x.quantile(0.95)
-
-    def q99(self, x):
-        return x.quantile(0.99)
-
 
 if __name__ == '__main__':
     import logging
     import tempfile
-    from pathlib import Path
 
     logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
     _logger = logging.getLogger('vis_test')
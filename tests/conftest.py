@@ -0,0 +1,118 @@
+import datetime as dt
+import gzip
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from fluxrun.ops import setup
+
+# Stand-in for the EddyPro executables: eddypro_rp writes one full_output record per raw
+# data file (timestamp at the end of the averaging period), it fails without output if a
+# raw data file contains FAIL_TOKEN in its name. eddypro_fcc does nothing.
+STANDIN_RP = '''#!{python}
+import datetime as dt
+import os
+import sys
+from pathlib import Path
+
+settings = {{}}
+with open(Path('..') / 'ini' / 'processing.eddypro') as f:
+    for line in f:
+        if '=' in line:
+            key, value = line.rstrip('\\n').split('=', 1)
+            settings[key] = value
+filenames = sorted(os.listdir(settings['data_path']))
+if {fail_token!r} and any({fail_token!r} in filename for filename in filenames):
+    print('Stand-in failure', file=sys.stderr)
+    sys.exit(1)
+records = []
+for filename in filenames:
+    print(' Processing new flux averaging period')
+    timestamp = dt.datetime.strptime(filename, 'SITE_%Y%m%d-%H%M.csv') + dt.timedelta(minutes=30)
+    with open(Path(settings['data_path']) / filename) as f:
+        num_lines = len(f.readlines())
+    records.append(f"{{filename}},{{timestamp:%Y-%m-%d}},{{timestamp:%H:%M}},{{num_lines}}\\n")
+outfile = Path(settings['out_path']) / f"eddypro_{{settings['project_id']}}_full_output_2025-01-01T000000_adv.csv"
+with open(outfile, 'w') as f:
+    f.write('file_info,,,\\nfilename,date,time,lines\\n,[yyyy-mm-dd],[HH:MM],[#]\\n')
+    f.writelines(records)
+'''
+
+STANDIN_FCC = '''#!{python}
+'''
+
+
+def write_rawdata_files(indir, start: dt.datetime, num_files: int, num_records: int = 3,
+                        compressed: bool = False) -> list:
+    """Raw data files with 3-row header, one file per 30 minutes, returns the filepaths"""
+    indir = Path(indir)
+    indir.mkdir(parents=True, exist_ok=True)
+    filepaths = []
+    for ix in range(num_files):
+        filedate = start + dt.timedelta(minutes=30 * ix)
+        filepath = indir / f"SITE_{filedate:%Y%m%d-%H%M}.csv{'.gz' if compressed else ''}"
+        with (gzip.open if compressed else open)(filepath, 'wt') as f:
+            f.write('u,v,w\n[m s-1],[m s-1],[m s-1]\nsonic,sonic,sonic\n')
+            f.writelines(f"{ix}.5,{record}.25,-0.1\n" for record in range(num_records))
+        filepaths.append(filepath)
+    return filepaths
+
+
+def make_eddypro_app(dirpath, fail_token: str = '') -> Path:
+    """Folder with the stand-in EddyPro executables"""
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    for name, source in [('eddypro_rp', STANDIN_RP), ('eddypro_fcc', STANDIN_FCC)]:
+        filepath = dirpath / name
+        filepath.write_text(source.format(python=sys.executable, fail_token=fail_token))
+        filepath.chmod(0o755)
+    return dirpath
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    """Factory for FluxRunEngine instances with the stand-in EddyPro executables.
+
+    Processing and metadata files are created in tmp_path, run ids are unique
+    within the test, log handlers are removed after the test.
+    """
+    from fluxrun.fluxrun_engine import FluxRunEngine
+
+    if os.name == 'nt':
+        pytest.skip("Stand-in EddyPro executables are scripts without .exe extension")
+
+    run_ids = iter(f"FR-20250101-{ix:06d}" for ix in range(1000))
+    monkeypatch.setattr(setup, 'generate_run_id', lambda: next(run_ids))
+
+    dir_proc = tmp_path / 'proc'
+    dir_proc.mkdir()
+    (dir_proc / 'site.eddypro').write_text('[Project]\nproject_id=old\nfile_name=old.eddypro\n'
+                                           'proj_file=old.metadata\nout_path=/old\ndata_path=/old\n'
+                                           'file_prototype=old\n')
+    (dir_proc / 'site.metadata').write_text('[Project]\nfile_name=old.metadata\n')
+
+    def _make_engine(indir, app_dir, rawdata: dict = None, output: dict = None, **flux_processing) -> FluxRunEngine:
+        settings = {
+            'RAWDATA': {'INDIR': str(indir), 'FILENAME_ID': 'SITE_yyyymmdd-HHMM.csv',
+                        'HEADER_FORMAT': '3-row header (bico files)',
+                        'START_DATE': '2025-01-01 00:00', 'END_DATE': '2025-12-31 23:59',
+                        'PLOT_RAWDATA_AVAILABILITY': 0, 'PLOT_RAWDATA_AGGREGATES': 0},
+            'FLUX_PROCESSING': {'RUN_FLUX_CALCS': 1, 'EDDYPRO_PROCESSING_FILE': str(dir_proc / 'site.eddypro'),
+                                'EDDYPRO_APP_DIR': str(app_dir), **flux_processing},
+            'OUTPUT': {'OUTDIR': str(tmp_path / 'out'), 'OUTDIR_PREFIX': 'SITE', 'PLOT_SUMMARY': 0},
+            'AFTER PROCESSING': {'DELETE_UNCOMPRESSED_ASCII_AFTER_PROCESSING': 0}}
+        settings['RAWDATA'].update(rawdata or {})
+        settings['OUTPUT'].update(output or {})
+        engine = FluxRunEngine(settings=settings)
+        engine.filepath_settings = tmp_path / 'fluxrunsettings.yaml'
+        return engine
+
+    yield _make_engine
+
+    log = logging.getLogger('fluxrun.ops.logger')
+    for handler in list(log.handlers):
+        handler.close()
+        log.removeHandler(handler)
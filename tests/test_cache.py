@@ -0,0 +1,254 @@
+import gzip
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from fluxrun.ops import cache, file
+
+
+def _parsed_cache_bytes(dirpath) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(dirpath) if entry.name.endswith('.pkl'))
+
+
+def _put_parsed(dirpath, source, max_bytes):
+    df = pd.DataFrame({'a': range(1000)}, dtype='float64')
+    cache.ParsedFileCache(dirpath=dirpath, max_bytes=max_bytes).put(
+        filepath=source, header_format='3-row header (bico files)', df=df, warnings=[])
+
+
+def test_parsed_file_cache_size_is_limited_while_adding(tmp_path):
+    """The size limit of the parsed file cache is enforced in put(), not only by evict() after the run"""
+    df = pd.DataFrame({'a': range(1000)}, dtype='float64')
+    sources = []
+    for ix in range(10):
+        source = tmp_path / f"SITE_20250601-{ix:02d}00.csv"
+        source.write_text('x')
+        sources.append(source)
+
+    dirpath = tmp_path / 'parsed'
+    entry_size = None
+    for ix, source in enumerate(sources):
+        parsed_cache = cache.ParsedFileCache(dirpath=dirpath, max_bytes=3 * (entry_size or 10 ** 9))
+        parsed_cache.put(filepath=source, header_format='3-row header (bico files)', df=df, warnings=[])
+        entry_size = entry_size or os.path.getsize(dirpath / f"{source.name}.pkl")
+        os.utime(dirpath / f"{source.name}.pkl", ns=(ix, ix))  # Distinct modification times for the LRU order
+        assert _parsed_cache_bytes(dirpath) <= 3 * entry_size
+
+    remaining = sorted(entry.name for entry in os.scandir(dirpath) if entry.name.endswith('.pkl'))
+    assert remaining[-1] == f"{sources[-1].name}.pkl"
+    assert parsed_cache.get(filepath=sources[-1], header_format='3-row header (bico files)') is not None
+    assert parsed_cache.get(filepath=sources[0], header_format='3-row header (bico files)') is None
+
+
+def test_parsed_file_cache_size_is_limited_across_processes(tmp_path):
+    """Workers that add entries at the same time share one size limit"""
+    sources = []
+    for ix in range(48):
+        source = tmp_path / f"SITE_20250601-{ix:02d}00.csv"
+        source.write_text('x')
+        sources.append(source)
+    dirpath = tmp_path / 'parsed'
+    _put_parsed(dirpath=dirpath, source=sources[0], max_bytes=None)
+    entry_size = _parsed_cache_bytes(dirpath)
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_put_parsed, [dirpath] * 48, sources, [16 * entry_size] * 48))
+    assert _parsed_cache_bytes(dirpath) <= 16 * entry_size
+    assert cache.ParsedFileCache(dirpath=dirpath).evict(max_bytes=None) == 0
+
+
+def test_processed_files_state(tmp_path):
+    files = {}
+    for name in ['SITE_20250601-0000.csv', 'SITE_20250601-0030.csv']:
+        (tmp_path / name).write_text('1,2,3\n')
+        files[name] = tmp_path / name
+    state = cache.ProcessedFilesState(filepath=tmp_path / 'cache' / 'processed_files.json')
+    assert state.pending(found_files=files) == files
+
+    state.mark_processed(files={'SITE_20250601-0000.csv': files['SITE_20250601-0000.csv']}, run_id='FR-1')
+    state.save()
+    state = cache.ProcessedFilesState(filepath=tmp_path / 'cache' / 'processed_files.json')
+    assert list(state.pending(found_files=files)) == ['SITE_20250601-0030.csv']
+
+    # Changed size or modification time, the file is processed again
+    (tmp_path / 'SITE_20250601-0000.csv').write_text('1,2,4\n')
+    os.utime(tmp_path / 'SITE_20250601-0000.csv', ns=(0, 0))
+    assert list(state.pending(found_files=files)) == ['SITE_20250601-0000.csv', 'SITE_20250601-0030.csv']
+
+
+def _write_gz(filepath, content: bytes, mtime_ns: int = None):
+    with gzip.open(filepath, 'wb') as f:
+        f.write(content)
+    if mtime_ns is not None:
+        os.utime(filepath, ns=(mtime_ns, mtime_ns))
+
+
+def _unzip_to_cache(uncompressed_cache, compr_filepath):
+    entry_filepath = uncompressed_cache.entry_filepath(compr_filepath)
+    file._uncompress_gz_file(str(compr_filepath), str(entry_filepath), 1024)
+    return entry_filepath
+
+
+def test_uncompressed_file_cache_new_entry_counts_as_just_used(tmp_path):
+    """Unzipped entries keep the mtime of the .gz file, but not its (old) atime"""
+    compr_filepath = tmp_path / 'SITE_20250601-0000.csv.gz'
+    _write_gz(compr_filepath, b'1,2,3\n', mtime_ns=1_000_000_000)
+    uncompressed_cache = cache.UncompressedFileCache(dirpath=tmp_path / 'uncompressed')
+    uncompressed_cache.dirpath.mkdir()
+
+    entry_filepath = _unzip_to_cache(uncompressed_cache, compr_filepath)
+    stat = os.stat(entry_filepath)
+    assert stat.st_mtime_ns == 1_000_000_000
+    assert stat.st_atime_ns > time.time_ns() - 60 * 1_000_000_000
+    assert uncompressed_cache.get(compr_filepath) == entry_filepath
+
+
+def test_uncompressed_file_cache_changed_gz_file_is_not_a_hit(tmp_path):
+    compr_filepath = tmp_path / 'SITE_20250601-0000.csv.gz'
+    _write_gz(compr_filepath, b'1,2,3\n', mtime_ns=1_000_000_000)
+    uncompressed_cache = cache.UncompressedFileCache(dirpath=tmp_path / 'uncompressed')
+    uncompressed_cache.dirpath.mkdir()
+    old_entry_filepath = _unzip_to_cache(uncompressed_cache, compr_filepath)
+
+    _write_gz(compr_filepath, b'1,2,3\n4,5,6\n', mtime_ns=2_000_000_000)
+    assert uncompressed_cache.get(compr_filepath) is None
+    new_entry_filepath = _unzip_to_cache(uncompressed_cache, compr_filepath)
+    assert new_entry_filepath != old_entry_filepath
+    assert uncompressed_cache.get(compr_filepath) == new_entry_filepath
+    assert new_entry_filepath.read_bytes() == b'1,2,3\n4,5,6\n'
+
+
+def test_uncompressed_file_cache_evicts_least_recently_used_to_byte_cap(tmp_path):
+    uncompressed_cache = cache.UncompressedFileCache(dirpath=tmp_path / 'uncompressed')
+    uncompressed_cache.dirpath.mkdir()
+    staged_refs = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    entries = []
+    for ix in range(4):
+        compr_filepath = tmp_path / f"SITE_20250601-{ix:02d}00.csv.gz"
+        _write_gz(compr_filepath, b'x' * 100)
+        entry_filepath = _unzip_to_cache(uncompressed_cache, compr_filepath)
+        os.utime(entry_filepath, ns=(ix * 1_000_000_000, 0))  # Access times in order of ix
+        entries.append(entry_filepath)
+
+    # Entry 0 is staged in a run folder and is kept, entry 1 is the least recently used other entry
+    staged_filepath = tmp_path / 'run' / entries[0].name
+    staged_filepath.parent.mkdir()
+    file.stage_file(src=entries[0], dst=staged_filepath)
+    staged_refs.add(shared_filepath=entries[0], staged_filepath=staged_filepath)
+
+    assert uncompressed_cache.evict(max_bytes=250, staged_refs=staged_refs) == 2
+    assert [entry.is_file() for entry in entries] == [True, False, False, True]
+    assert uncompressed_cache.evict(max_bytes=250, staged_refs=staged_refs) == 0
+
+
+def test_uncompress_gz_file_removes_tmp_file_of_corrupt_gz_file(tmp_path):
+    compr_filepath = tmp_path / 'SITE_20250601-0000.csv.gz'
+    compr_filepath.write_bytes(gzip.compress(b'1,2,3\n' * 1000)[:-20])
+    with pytest.raises(EOFError):
+        file._uncompress_gz_file(str(compr_filepath), str(tmp_path / 'SITE_20250601-0000.csv'), 1024)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['SITE_20250601-0000.csv.gz']
+
+
+def test_staged_file_refs_are_shared_between_runs(tmp_path):
+    """References added by runs at the same time are all kept"""
+    shared = [tmp_path / f"shared_{ix}.csv" for ix in range(2)]
+    for filepath in shared:
+        filepath.write_text('1,2,3\n')
+    staged = []
+    for run in ['run_1', 'run_2']:
+        (tmp_path / run).mkdir()
+        staged.append(tmp_path / run / 'SITE_20250601-0000.csv')
+        file.stage_file(src=shared[0], dst=staged[-1])
+
+    refs_run_1 = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    refs_run_2 = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    refs_run_1.add(shared_filepath=shared[0], staged_filepath=staged[0])
+    refs_run_2.add(shared_filepath=shared[0], staged_filepath=staged[1])
+    refs_run_2.add(shared_filepath=shared[1], staged_filepath=tmp_path / 'run_2' / 'deleted.csv')
+    refs_run_1.close()
+    refs_run_2.close()
+
+    staged_refs = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    assert staged_refs.num_refs(shared[0]) == 2
+    assert staged_refs.num_refs(shared[1]) == 0
+    assert staged_refs.release(staged_filepaths=[staged[0]]) == [str(shared[1])]
+    assert staged_refs.num_refs(shared[0]) == 1
+    os.remove(staged[1])
+    assert staged_refs.release(staged_filepaths=[]) == [str(shared[0])]
+    staged_refs.close()
+
+
+def test_staged_file_refs_lock_blocks_other_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache.StagedFileRefs, 'LOCK_TIMEOUT_SECONDS', 0.1)
+    refs_run_1 = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    refs_run_2 = cache.StagedFileRefs(filepath=tmp_path / 'uncompressed_refs.sqlite')
+    with refs_run_1.lock():
+        refs_run_1.add(shared_filepath=tmp_path / 'shared.csv', staged_filepath=tmp_path / 'staged.csv')
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            refs_run_2.add(shared_filepath=tmp_path / 'shared.csv', staged_filepath=tmp_path / 'other.csv')
+    refs_run_2.add(shared_filepath=tmp_path / 'shared.csv', staged_filepath=tmp_path / 'other.csv')
+    assert refs_run_2.conn.execute("SELECT COUNT(*) FROM refs").fetchone() == (2,)
+    refs_run_1.close()
+    refs_run_2.close()
+
+
+def _set_mtime(path, mtime_ns: int):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_directory_index_reuses_listing_of_unmodified_folder(tmp_path):
+    """Folders are only listed again after they were modified, listings are kept across runs"""
+    data_dir = tmp_path / 'data'
+    (data_dir / 'sub').mkdir(parents=True)
+    (data_dir / 'SITE_20250601-0000.csv').write_text('1,2,3\n')
+    _set_mtime(data_dir / 'SITE_20250601-0000.csv', mtime_ns=time.time_ns() - 7200 * 10 ** 9)
+    _set_mtime(data_dir, mtime_ns=time.time_ns() - 60 * 10 ** 9)
+    index_filepath = tmp_path / 'cache' / 'directory_index.json'
+
+    index = cache.DirectoryIndex(filepath=index_filepath)
+    assert index.list_dir(data_dir) == ({'SITE_20250601-0000.csv': 6}, ['sub'])
+    assert index.list_dir(data_dir) == ({'SITE_20250601-0000.csv': 6}, ['sub'])
+    assert (index.num_listed, index.num_lookups) == (1, 1)
+    index.save()
+
+    index = cache.DirectoryIndex(filepath=index_filepath)
+    assert index.list_dir(data_dir) == ({'SITE_20250601-0000.csv': 6}, ['sub'])
+    assert (index.num_listed, index.num_lookups) == (0, 1)
+
+    # Adding a file modifies the folder
+    (data_dir / 'SITE_20250601-0030.csv').write_text('1,2\n')
+    _set_mtime(data_dir, mtime_ns=time.time_ns() - 30 * 10 ** 9)
+    assert index.list_dir(data_dir) == ({'SITE_20250601-0000.csv': 6, 'SITE_20250601-0030.csv': 4}, ['sub'])
+    assert (index.num_listed, index.num_lookups) == (1, 1)
+
+
+def test_directory_index_rechecks_recent_files_and_racy_listings(tmp_path):
+    """Sizes of recently modified files are checked again, listings close to the folder mtime are not reused"""
+    (tmp_path / 'SITE_20250601-0000.csv').write_text('')
+    dir_mtime_ns = time.time_ns() - 60 * 10 ** 9
+    _set_mtime(tmp_path, mtime_ns=dir_mtime_ns)
+
+    index = cache.DirectoryIndex()
+    assert index.list_dir(tmp_path) == ({'SITE_20250601-0000.csv': 0}, [])
+    (tmp_path / 'SITE_20250601-0000.csv').write_text('1,2,3\n')  # File was still written, folder unchanged
+    assert index.list_dir(tmp_path) == ({'SITE_20250601-0000.csv': 6}, [])
+    assert (index.num_listed, index.num_lookups) == (1, 1)
+
+    # Folder modified right before it was listed: a file added within the same mtime tick could be missed
+    (tmp_path / 'SITE_20250601-0030.csv').write_text('1,2\n')
+    expected = {'SITE_20250601-0000.csv': 6, 'SITE_20250601-0030.csv': 4}
+    assert index.list_dir(tmp_path)[0] == expected
+    assert index.list_dir(tmp_path)[0] == expected
+    assert (index.num_listed, index.num_lookups) == (3, 1)
+
+
+def test_directory_index_rebuilds_unreadable_index_file(tmp_path):
+    index_filepath = tmp_path / 'directory_index.json'
+    index_filepath.write_text('{not json')
+    index = cache.DirectoryIndex(filepath=index_filepath)
+    assert index.dirs == {}
+    assert index.list_dir(tmp_path) == ({'directory_index.json': 9}, [])
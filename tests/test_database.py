@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fluxrun.ops import database
+
+
+def _full_output(timestamps: list, data: dict) -> pd.DataFrame:
+    """Full output data with 2-row header (var, units), like ReadEddyProFullOutputFile"""
+    df = pd.DataFrame({col: values for col, values in data.items()},
+                      index=pd.DatetimeIndex(pd.to_datetime(timestamps), name=database.FluxDatabase.INDEX_NAME))
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    return df
+
+
+@pytest.fixture
+def flux_db(tmp_path):
+    flux_db = database.FluxDatabase(filepath=tmp_path / 'SITE_fluxes.sqlite')
+    yield flux_db
+    flux_db.close()
+
+
+def test_upsert_replaces_records_with_same_timestamp(flux_db):
+    timestamps = ['2025-06-01 00:30', '2025-06-01 01:00']
+    first = _full_output(timestamps, {('co2_flux', '[µmol+1s-1m-2]'): [1.5, np.nan],
+                                      ('qc_co2_flux', '[#]'): np.array([0, 1], dtype='int64'),
+                                      ('filename', '[-]'): ['a.csv', 'b.csv']})
+    assert flux_db.upsert(df=first, run_id='FR-1') == (2, 0)
+
+    second = _full_output(timestamps[1:] + ['2025-06-01 01:30'],
+                          {('co2_flux', '[µmol+1s-1m-2]'): [2.5, 3.5],
+                           ('qc_co2_flux', '[#]'): np.array([2, 0], dtype='int64'),
+                           ('filename', '[-]'): ['b.csv', 'c.csv']})
+    assert flux_db.upsert(df=second, run_id='FR-2') == (1, 1)
+
+    df = flux_db.read()
+    assert df.index.strftime('%H:%M').tolist() == ['00:30', '01:00', '01:30']
+    assert df[('co2_flux', '[µmol+1s-1m-2]')].tolist() == [1.5, 2.5, 3.5]
+    assert df[('qc_co2_flux', '[#]')].tolist() == [0, 2, 0]
+    assert df[('filename', '[-]')].tolist() == ['a.csv', 'b.csv', 'c.csv']
+    run_ids = flux_db.conn.execute("SELECT run_id FROM fluxes ORDER BY timestamp").fetchall()
+    assert [run_id for run_id, in run_ids] == ['FR-1', 'FR-2', 'FR-2']
+
+
+def test_upsert_adds_new_variables(flux_db):
+    flux_db.upsert(df=_full_output(['2025-06-01 00:30'], {('H', '[W+1m-2]'): [10.0]}), run_id='FR-1')
+    flux_db.upsert(df=_full_output(['2025-06-01 01:00'], {('H', '[W+1m-2]'): [20.0],
+                                                          ('u"star', '[m+1s-1]'): [0.3],
+                                                          ('unknown_1-123456', '[-unknown-]'): [7.0]}),
+                   run_id='FR-2')
+
+    assert flux_db.variables() == {'H': '[W+1m-2]', 'u"star': '[m+1s-1]', 'unknown_1': '[-unknown-]'}
+    df = flux_db.read()
+    assert df[('H', '[W+1m-2]')].tolist() == [10.0, 20.0]
+    assert np.isnan(df[('u"star', '[m+1s-1]')].iloc[0]) and df[('u"star', '[m+1s-1]')].iloc[1] == 0.3
+    assert df[('unknown_1', '[-unknown-]')].iloc[1] == 7.0
+
+
+def test_read_time_slice(flux_db):
+    timestamps = pd.date_range('2025-06-01 00:30', periods=48, freq='30min')
+    flux_db.upsert(df=_full_output(list(timestamps), {('H', '[W+1m-2]'): np.arange(48.0),
+                                                      ('LE', '[W+1m-2]'): np.arange(48.0) * 2}),
+                   run_id='FR-1')
+
+    df = flux_db.read(start='2025-06-01 06:00', end='2025-06-01 08:00', variables=['LE'])
+    assert df.index.name == database.FluxDatabase.INDEX_NAME
+    assert df.columns.tolist() == [('LE', '[W+1m-2]')]
+    assert df.index[0] == pd.Timestamp('2025-06-01 06:00') and df.index[-1] == pd.Timestamp('2025-06-01 08:00')
+    assert df[('LE', '[W+1m-2]')].tolist() == [22.0, 24.0, 26.0, 28.0, 30.0]
+
+
+def test_read_unknown_variable(flux_db):
+    flux_db.upsert(df=_full_output(['2025-06-01 00:30'], {('H', '[W+1m-2]'): [10.0]}), run_id='FR-1')
+    with pytest.raises(ValueError, match='co2_flux'):
+        flux_db.read(variables=['H', 'co2_flux'])
+
+
+def test_read_empty_database(flux_db):
+    assert flux_db.read().empty
+
+
+def test_variables_that_differ_only_by_case(flux_db):
+    """SQLite column names are case-insensitive, h gets its own column next to H"""
+    flux_db.upsert(df=_full_output(['2025-06-01 00:30'], {('H', '[W+1m-2]'): [10.0]}), run_id='FR-1')
+    flux_db.upsert(df=_full_output(['2025-06-01 01:00'], {('H', '[W+1m-2]'): [20.0], ('h', '[m]'): [2.0],
+                                                          ('RUN_ID', '[-]'): ['x']}),
+                   run_id='FR-2')
+
+    assert flux_db.variables() == {'H': '[W+1m-2]', 'h': '[m]', 'RUN_ID': '[-]'}
+    df = flux_db.read()
+    assert df.columns.tolist() == [('H', '[W+1m-2]'), ('h', '[m]'), ('RUN_ID', '[-]')]
+    assert df[('H', '[W+1m-2]')].tolist() == [10.0, 20.0]
+    assert np.isnan(df[('h', '[m]')].iloc[0]) and df[('h', '[m]')].iloc[1] == 2.0
+    assert df[('RUN_ID', '[-]')].iloc[1] == 'x'
+    assert flux_db.read(variables=['h']).columns.tolist() == [('h', '[m]')]
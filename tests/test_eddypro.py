@@ -0,0 +1,216 @@
+import datetime as dt
+import os
+from pathlib import Path
+
+import pytest
+
+from conftest import make_eddypro_app, write_rawdata_files
+from fluxrun.ops import cache, eddypro
+
+HEADER = 'file_info,,,\nfilename,date,time,lines\n,[yyyy-mm-dd],[HH:MM],[#]\n'
+
+
+def _write_full_output(filepath, records: list, header: str = HEADER) -> Path:
+    filepath = Path(filepath)
+    filepath.write_text(header + ''.join(f"{record}\n" for record in records))
+    return filepath
+
+
+def _record(timestamp: str, value='1') -> str:
+    date, time = timestamp.split(' ')
+    return f"f,{date},{time},{value}"
+
+
+def _merged_records(filepath) -> list:
+    lines = Path(filepath).read_text().splitlines()
+    assert ''.join(line + '\n' for line in lines[:3]) == HEADER
+    return lines[3:]
+
+
+def test_split_into_windows_is_contiguous_and_time_ordered():
+    found_files = {f"f{ix}": f"/data/f{ix}" for ix in [5, 0, 3, 1, 4, 2, 6]}
+    filedates = {name: dt.datetime(2025, 6, 1) + dt.timedelta(minutes=30 * int(name[1:])) for name in found_files}
+    windows = eddypro.split_into_windows(found_files=found_files, filedates=filedates, num_windows=3)
+    assert [list(window) for window in windows] == [['f0', 'f1'], ['f2', 'f3', 'f4'], ['f5', 'f6']]
+
+
+def test_split_into_windows_with_fewer_files_than_windows():
+    found_files = {'b': '/data/b', 'a': '/data/a'}
+    filedates = {'a': dt.datetime(2025, 6, 1, 0, 0), 'b': dt.datetime(2025, 6, 1, 0, 30)}
+    windows = eddypro.split_into_windows(found_files=found_files, filedates=filedates, num_windows=4)
+    assert windows == [{'a': '/data/a'}, {'b': '/data/b'}]
+
+
+def test_merge_full_output_files_in_time_order(tmp_path):
+    later = _write_full_output(tmp_path / 'c.csv', [_record('2025-06-02 00:30'), _record('2025-06-02 01:00')])
+    empty = _write_full_output(tmp_path / 'b.csv', [])
+    earlier = _write_full_output(tmp_path / 'a.csv', [_record('2025-06-01 23:30'), _record('2025-06-02 00:00')])
+    outfile = tmp_path / 'merged.csv'
+
+    num_records = eddypro.merge_full_output_files(filepaths=[later, empty, earlier], outfile=outfile)
+
+    assert num_records == 4
+    assert _merged_records(outfile) == [_record('2025-06-01 23:30'), _record('2025-06-02 00:00'),
+                                        _record('2025-06-02 00:30'), _record('2025-06-02 01:00')]
+
+
+def test_merge_full_output_files_with_different_header(tmp_path):
+    first = _write_full_output(tmp_path / 'a.csv', [_record('2025-06-01 00:30')])
+    other = _write_full_output(tmp_path / 'b.csv', [_record('2025-06-01 01:00')],
+                               header=HEADER.replace('lines', 'records'))
+    with pytest.raises(ValueError):
+        eddypro.merge_full_output_files(filepaths=[first, other], outfile=tmp_path / 'merged.csv')
+
+
+def _full_output_records(engine) -> list:
+    results = Path(engine.settings['_dir_out_run_eddypro_results'])
+    full_output_files = list(results.glob('*_full_output_*.csv'))
+    assert len(full_output_files) == 1
+    return [line.split(',')[0] for line in _merged_records(full_output_files[0])]
+
+
+def test_eddypro_chunks_are_merged_in_time_order(tmp_path, make_engine):
+    filepaths = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1), num_files=7)
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=make_eddypro_app(tmp_path / 'app'), EDDYPRO_CHUNKS=3)
+    engine.run()
+
+    assert _full_output_records(engine) == [filepath.name for filepath in filepaths]
+    chunks = sorted((Path(engine.settings['_dir_out_run_eddypro']) / 'chunks').iterdir())
+    assert [chunk.name for chunk in chunks] == ['chunk_01', 'chunk_02', 'chunk_03']
+    assert not any((chunk / 'data').exists() for chunk in chunks)
+
+
+def test_eddypro_chunks_with_more_chunks_than_files(tmp_path, make_engine):
+    filepaths = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1), num_files=2)
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=make_eddypro_app(tmp_path / 'app'), EDDYPRO_CHUNKS=4)
+    engine.run()
+
+    assert _full_output_records(engine) == [filepath.name for filepath in filepaths]
+    assert len(list((Path(engine.settings['_dir_out_run_eddypro']) / 'chunks').iterdir())) == 2
+
+
+def test_eddypro_chunk_without_full_output(tmp_path, make_engine):
+    """A failed chunk is left out of the merged file, the other chunks are merged"""
+    filepaths = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1, 22, 0), num_files=6)
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=make_eddypro_app(tmp_path / 'app', fail_token='0601-2300'),
+                         EDDYPRO_CHUNKS=3)
+    engine.run()
+
+    # Chunks: 22:00 + 22:30, 23:00 + 23:30 (failed), 00:00 + 00:30
+    assert _full_output_records(engine) == [filepaths[ix].name for ix in [0, 1, 4, 5]]
+
+
+def test_update_master_full_output_appends_later_records(tmp_path):
+    master = tmp_path / 'master.csv'
+    first = _write_full_output(tmp_path / 'a.csv', [_record('2025-06-01 00:30'), _record('2025-06-01 01:00')])
+    later = _write_full_output(tmp_path / 'b.csv', [_record('2025-06-01 02:00'), _record('2025-06-01 01:30')])
+
+    assert eddypro.update_master_full_output(master=master, new=first) == (2, 0)
+    assert eddypro.update_master_full_output(master=master, new=later) == (2, 0)
+    assert _merged_records(master) == [_record('2025-06-01 00:30'), _record('2025-06-01 01:00'),
+                                       _record('2025-06-01 01:30'), _record('2025-06-01 02:00')]
+
+
+def test_update_master_full_output_replaces_earlier_records(tmp_path):
+    master = _write_full_output(tmp_path / 'master.csv', [_record('2025-06-01 00:30'), _record('2025-06-01 01:00'),
+                                                          _record('2025-06-01 02:00')])
+    new = _write_full_output(tmp_path / 'new.csv', [_record('2025-06-01 01:00', value='2'),
+                                                    _record('2025-06-01 01:30', value='2')])
+
+    assert eddypro.update_master_full_output(master=master, new=new) == (1, 1)
+    assert _merged_records(master) == [_record('2025-06-01 00:30'), _record('2025-06-01 01:00', value='2'),
+                                       _record('2025-06-01 01:30', value='2'), _record('2025-06-01 02:00')]
+
+
+def test_update_master_full_output_with_different_header(tmp_path):
+    master = _write_full_output(tmp_path / 'master.csv', [_record('2025-06-01 00:30')])
+    new = _write_full_output(tmp_path / 'new.csv', [_record('2025-06-01 01:00')],
+                             header=HEADER.replace('lines', 'records'))
+    with pytest.raises(ValueError):
+        eddypro.update_master_full_output(master=master, new=new)
+    assert _merged_records(master) == [_record('2025-06-01 00:30')]
+
+
+def _master_records(tmp_path) -> dict:
+    """Records of the master full_output file by raw data filename (number of lines in the file)"""
+    records = _merged_records(tmp_path / 'out' / 'SITE_full_output_master.csv')
+    by_filename = {record.split(',')[0]: int(record.split(',')[3]) for record in records}
+    assert len(by_filename) == len(records), "Duplicate records in master"
+    assert list(by_filename) == sorted(by_filename), "Master not in time order"
+    return by_filename
+
+
+def test_incremental_runs(tmp_path, make_engine):
+    """Failed chunks are processed again in the next run, changed files replace their
+    records, later files are appended"""
+    filepaths = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1, 22, 0), num_files=6)
+    failing_app = make_eddypro_app(tmp_path / 'app_failing', fail_token='0601-2300')
+    app = make_eddypro_app(tmp_path / 'app')
+
+    # Chunks: 22:00 + 22:30, 23:00 + 23:30 (failed), 00:00 + 00:30
+    make_engine(indir=tmp_path / 'raw', app_dir=failing_app, INCREMENTAL=1, EDDYPRO_CHUNKS=3).run()
+    assert list(_master_records(tmp_path)) == [filepaths[ix].name for ix in [0, 1, 4, 5]]
+    state = cache.ProcessedFilesState(filepath=tmp_path / 'out' / 'SITE_cache' / 'processed_files.json')
+    assert sorted(state.files) == [filepaths[ix].name for ix in [0, 1, 4, 5]]
+
+    # Only the files of the failed chunk are processed, their records are inserted
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=app, INCREMENTAL=1, EDDYPRO_CHUNKS=3)
+    engine.run()
+    assert _full_output_records(engine) == [filepaths[ix].name for ix in [2, 3]]
+    assert list(_master_records(tmp_path)) == [filepath.name for filepath in filepaths]
+
+    # A changed file replaces its record
+    write_rawdata_files(tmp_path / 'changed', start=dt.datetime(2025, 6, 1, 23, 0), num_files=1, num_records=10)
+    os.replace(tmp_path / 'changed' / filepaths[2].name, filepaths[2])
+    make_engine(indir=tmp_path / 'raw', app_dir=app, INCREMENTAL=1).run()
+    master = _master_records(tmp_path)
+    assert list(master) == [filepath.name for filepath in filepaths]
+    assert master[filepaths[2].name] == 13 and master[filepaths[3].name] == 6
+
+    # Later files are appended
+    later = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 2, 1, 0), num_files=2)
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=app, INCREMENTAL=1)
+    engine.run()
+    assert _full_output_records(engine) == [filepath.name for filepath in later]
+    assert list(_master_records(tmp_path)) == [filepath.name for filepath in filepaths + later]
+
+
+def test_incremental_run_only_unzips_new_files(tmp_path, make_engine):
+    """Files that were already processed are not unzipped or validated again, a run
+    without new files skips flux calculations and output"""
+    filepaths = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1, 22, 0), num_files=4,
+                                    compressed=True)
+    app = make_eddypro_app(tmp_path / 'app')
+    options = dict(indir=tmp_path / 'raw', app_dir=app, rawdata={'FILENAME_ID': 'SITE_yyyymmdd-HHMM.csv.gz'},
+                   output={'PLOT_SUMMARY': 1, 'SUMMARY_STATS': 1, 'FLUX_DATABASE': 1}, INCREMENTAL=1)
+    make_engine(**options).run()
+    assert list(_master_records(tmp_path)) == [filepath.stem for filepath in filepaths]
+
+    engine = make_engine(**options)
+    engine.run()
+    assert not list(Path(engine.settings['_dir_out_run_rawdata_ascii_files']).glob('*.csv'))
+    logfile = Path(engine.settings['_dir_out_run_log']) / f"{engine.settings['_run_id']}_main.log"
+    log = logfile.read_text()
+    assert '[INCREMENTAL] 0 of 4 raw data files are new or changed' in log
+    assert 'flux calculations and output are skipped' in log
+    assert 'VALIDATING NUMERIC DATA' not in log and 'full_output' not in log
+
+    later = write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 2, 0, 0), num_files=1, compressed=True)
+    engine = make_engine(**options)
+    engine.run()
+    unzipped = Path(engine.settings['_dir_out_run_rawdata_ascii_files']).glob('*.csv')
+    assert [filepath.name for filepath in unzipped] == [later[0].stem]
+    assert list(_master_records(tmp_path)) == [filepath.stem for filepath in filepaths + later]
+
+
+@pytest.mark.parametrize('summary_stats', [0, 1])
+def test_summary_stats_folder_only_with_summary_stats(tmp_path, make_engine, summary_stats):
+    write_rawdata_files(tmp_path / 'raw', start=dt.datetime(2025, 6, 1, 22, 0), num_files=2)
+    engine = make_engine(indir=tmp_path / 'raw', app_dir=make_eddypro_app(tmp_path / 'app'),
+                         output={'SUMMARY_STATS': summary_stats})
+    engine.run()
+    dir_stats = Path(engine.settings['_dir_out_run']) / '2-2_eddypro_flux_calculations_summary_stats'
+    if summary_stats:
+        assert [filepath.name for filepath in dir_stats.iterdir()] == [f"{engine.settings['_run_id']}_summary_stats.csv"]
+    else:
+        assert not dir_stats.exists()
@@ -0,0 +1,172 @@
+import datetime as dt
+import gzip
+import logging
+import warnings
+
+import pandas as pd
+import pytest
+
+from fluxrun.ops import file
+
+
+def _settings(tmp_path, **rawdata):
+    return {'RAWDATA': {'HEADER_FORMAT': '3-row header (bico files)', **rawdata},
+            '_dir_out_run_rawdata_ascii_files': str(tmp_path / 'run')}
+
+
+def test_validate_file_rewrites_parsed_values_with_lean_dtypes(tmp_path):
+    """Lean dtypes must not change the values of files that are rewritten for EddyPro"""
+    (tmp_path / 'run').mkdir()
+    filepath = tmp_path / 'SITE_20250601-0000.csv'
+    filepath.write_text("secs,u,t\n"
+                        "[s],[m s-1],[degC]\n"
+                        "sonic,sonic,sonic\n"
+                        "1729000000.05,1.23456789,20.1\n"
+                        "1729000000.10,1.5,x\n"
+                        "1729000000.15,-0.25,20.3\n")
+    result = file._validate_file(settings=_settings(tmp_path, LEAN_DTYPES=1), filename=filepath.name,
+                                 filepath=str(filepath), calc_aggregates=True)
+
+    assert result['error'] is None
+    assert [col[0] for col in result['coerced_cols']] == ['t']
+    rewritten = pd.read_csv(tmp_path / 'run' / filepath.name, header=[0, 1, 2])
+    assert rewritten[('secs', '[s]', 'sonic')].tolist() == [1729000000.05, 1729000000.10, 1729000000.15]
+    assert rewritten[('u', '[m s-1]', 'sonic')].tolist() == [1.23456789, 1.5, -0.25]
+    assert rewritten[('t', '[degC]', 'sonic')].tolist() == [20.1, -9999, 20.3]
+
+
+def test_read_full_output_lean_dtypes_with_chunk_without_data(tmp_path, monkeypatch):
+    """Chunks without data do not change the lean dtypes of the columns"""
+    monkeypatch.setattr(file.ReadEddyProFullOutputFile, 'LEAN_CHUNK_ROWS', 2)
+    filepath = tmp_path / 'eddypro_SITE_full_output_2025-06-01T000000_adv.csv'
+    filepath.write_text("file_info,,,,,\n"
+                        "filename,date,time,co2_flux,qc_co2_flux,wind_dir_class\n"
+                        ",[yyyy-mm-dd],[HH:MM],[µmol+1s-1m-2],[#],[-]\n"
+                        "a.csv,2025-06-01,00:30,-9999,-9999,\n"
+                        "b.csv,2025-06-01,01:00,-9999,-9999,\n"
+                        "c.csv,2025-06-01,01:30,1.25,0,N\n"
+                        "d.csv,2025-06-01,02:00,2.5,1,N\n")
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        df = file.ReadEddyProFullOutputFile(filepath=filepath, lean_dtypes=True).get()
+
+    assert df[('co2_flux', '[µmol+1s-1m-2]')].dtype == 'float32'
+    assert df[('qc_co2_flux', '[#]')].dtype == 'Int8'
+    assert df[('qc_co2_flux', '[#]')].tolist()[2:] == [0, 1] and df[('qc_co2_flux', '[#]')].isna().sum() == 2
+    assert df[('wind_dir_class', '[-]')].dtype == 'category'
+    assert df[('wind_dir_class', '[-]')].tolist()[2:] == ['N', 'N']
+    assert len(df) == 4
+
+
+@pytest.mark.parametrize('filename', [
+    'SITE_20250601-0030.csv', 'SITE_2025061-0030.csv', 'SITE_202561-030.csv', 'site_20250601-0030.csv',
+    'SITE_20250631-0030.csv', 'SITE_20251301-0030.csv', 'SITE_20250601-2400.csv', 'SITE_20250601-0030.csv.gz',
+    'OTHER_20250601-0030.csv', 'SITE_2025060-0030.csv'])
+def test_filename_matcher_parses_like_strptime(filename):
+    parse_str_py = 'SITE_%Y%m%d-%H%M.csv'
+    try:
+        expected = dt.datetime.strptime(filename, parse_str_py)
+    except ValueError:
+        expected = None
+    assert file.FilenameMatcher(parse_str_py=parse_str_py).parse(filename) == expected
+
+
+def test_filename_matcher_other_directives_fall_back_to_strptime():
+    matcher = file.FilenameMatcher(parse_str_py='SITE_%y%j.csv')
+    assert matcher.regex is None
+    assert matcher.parse('SITE_25152.csv') == dt.datetime(2025, 6, 1)
+    assert matcher.parse('SITE_25152.dat') is None
+
+
+@pytest.mark.parametrize('name, parent_year, expected', [
+    ('2019', None, (True, 2019)),
+    ('2025', None, (False, 2025)),
+    ('202504', None, (True, None)),
+    ('2025-06', None, (False, None)),
+    ('2025_07', None, (True, None)),
+    ('04', 2025, (True, None)),
+    ('06', 2025, (False, None)),
+    ('04', None, (False, None)),
+    ('13', 2025, (False, 2025)),
+    ('1850', None, (False, None)),
+    ('logger_2019', None, (False, None)),
+])
+def test_subdir_outside_daterange(name, parent_year, expected):
+    assert file.subdir_outside_daterange(name=name, parent_year=parent_year,
+                                         start_date=dt.datetime(2025, 5, 15), end_date=dt.datetime(2025, 6, 30)) \
+        == expected
+
+
+@pytest.mark.parametrize('skip_date_folders, expected', [
+    (0, ['SITE_20250601-0000.csv', 'SITE_20250601-0030.csv', 'SITE_20250601-0100.csv', 'SITE_20250601-0130.csv']),
+    (1, ['SITE_20250601-0000.csv', 'SITE_20250601-0130.csv']),
+])
+def test_search_all_skip_date_folders(tmp_path, skip_date_folders, expected):
+    """Files in folders named after other years or months are only missed if SKIP_DATE_FOLDERS is selected"""
+    for folder, filename in [('2025/06', 'SITE_20250601-0000.csv'), ('2024', 'SITE_20250601-0030.csv'),
+                             ('2025/04', 'SITE_20250601-0100.csv'), ('logger', 'SITE_20250601-0130.csv')]:
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+        (tmp_path / folder / filename).write_text('1,2,3\n')
+    (tmp_path / 'logger' / 'SITE_20250601-0200.csv').write_text('')
+    settings = {'RAWDATA': {'START_DATE': '2025-05-01 00:00', 'END_DATE': '2025-06-30 23:59',
+                            'SKIP_DATE_FOLDERS': skip_date_folders},
+                '_sitefiles_parse_str_python': 'SITE_%Y%m%d-%H%M.csv'}
+    found = file.SearchAll(logger=logging.getLogger('test_file'), search_in_dir=str(tmp_path),
+                           settings=settings).keep_valid_files()
+    assert sorted(found) == expected
+
+
+@pytest.mark.parametrize('header_format', ['3-row header (bico files)', '4-row header (rECord files)'])
+@pytest.mark.parametrize('line_end', ['\n', '\r\n'])
+def test_read_file_replaces_bad_lines(tmp_path, header_format, line_end):
+    """Too long lines are replaced with -9999 (NaN), too short lines are filled with NaN"""
+    lines = ['secs,u,t', '[s],[m s-1],[degC]', 'sonic,sonic,sonic',
+             '1,1.5,20.1',
+             '2,1.6,20.2,99',  # Too long
+             '3,1.7',  # Too short
+             '4,1.8,20.4,99,99',  # Too long
+             '5,1.9,20.5']
+    if header_format == '4-row header (rECord files)':
+        lines.insert(0, 'TOA5,logger,CR3000')
+    filepath = tmp_path / 'SITE_20250601-0000.csv'
+    filepath.write_bytes(line_end.join(lines + ['']).encode())
+    logger = logging.getLogger('test_file')
+
+    df = file.read_uncompr_ascii_file(settings={'RAWDATA': {'HEADER_FORMAT': header_format}},
+                                      filepath=str(filepath), logger=logger, section_id='[TEST]', verbose=False)
+
+    assert list(df.columns) == [('secs', '[s]', 'sonic'), ('u', '[m s-1]', 'sonic'), ('t', '[degC]', 'sonic')]
+    pd.testing.assert_frame_equal(df, pd.DataFrame([[1, 1.5, 20.1], [None, None, None], [3, 1.7, None],
+                                                    [None, None, None], [5, 1.9, 20.5]],
+                                                   columns=df.columns, dtype='float64'))
+
+
+def test_replace_bad_lines_keeps_line_ends():
+    """Only too long lines are replaced, other lines are kept byte for byte"""
+    data = b'secs,u,t\r\n[s],[m s-1],[degC]\r\nsonic,sonic,sonic\r\n1,2,3\r\n4,5,6,7\r\n8,9\r\n'
+    assert file._replace_bad_lines(data=data, n_cols=3, num_header_lines=3) \
+        == b'secs,u,t\r\n[s],[m s-1],[degC]\r\nsonic,sonic,sonic\r\n1,2,3\r\n-9999,-9999,-9999\n8,9\r\n'
+
+
+def test_replace_bad_lines_keeps_header_lines():
+    """Header lines are never replaced, even if they have more fields than data lines"""
+    data = b'secs,u,t,x\n[s],[m s-1],[degC],[-]\nsonic,sonic,sonic,sonic\n1,2,3\n'
+    assert file._replace_bad_lines(data=data, n_cols=3, num_header_lines=3) == data
+
+
+def test_uncompressed_size(tmp_path):
+    """Size of .gz files is read from the gzip trailer, other files are not opened"""
+    content = b'secs,u,t\n' + b'1729000000.05,1.23456789,20.1\n' * 5000
+    gz_filepath = tmp_path / 'SITE_20250601-0000.csv.gz'
+    with gzip.open(gz_filepath, 'wb') as f:
+        f.write(content)
+    csv_filepath = tmp_path / 'SITE_20250601-0000.csv'
+    csv_filepath.write_bytes(content)
+    empty_gz_filepath = tmp_path / 'SITE_20250601-0030.csv.gz'
+    empty_gz_filepath.write_bytes(b'')
+
+    assert gz_filepath.stat().st_size < len(content)
+    assert file.uncompressed_size(gz_filepath) == len(content)
+    assert file.uncompressed_size(str(gz_filepath)) == len(content)
+    assert file.uncompressed_size(csv_filepath) == len(content)
+    assert file.uncompressed_size(empty_gz_filepath) == 0
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fluxrun.ops import stats
+
+
+def test_calc_aggregates_array_same_as_pandas():
+    """Aggregates of columns with NaNs, a single value and no data are the same as with pandas"""
+    rng = np.random.default_rng(42)
+    values = rng.normal(size=(101, 4))
+    values[rng.random(101) < 0.2, 0] = np.nan  # Column with gaps
+    values[1:, 2] = np.nan  # Column with one value
+    values[:, 3] = np.nan  # Column without data
+    df = pd.DataFrame(values)
+
+    aggs = pd.DataFrame(stats.calc_aggregates_array(values=values), columns=stats.AGGREGATES)
+
+    expected = pd.DataFrame({'count': df.count(), 'min': df.min(), 'max': df.max(),
+                             'mean': df.mean(), 'std': df.std()})
+    for agg, q in stats.AGGREGATES_QUANTILES.items():
+        expected[agg] = df.quantile(q)
+    pd.testing.assert_frame_equal(aggs, expected[stats.AGGREGATES], check_dtype=False)
+
+
+def test_calc_file_aggregates_ignores_missing_values():
+    """Missing values -9999 and non-numeric values are not counted"""
+    df = pd.DataFrame({('u', '[m s-1]', 'sonic'): [1.0, -9999, 3.0],
+                       ('t', '[degC]', 'sonic'): ['20.1', 'x', '20.3']})
+    aggs = stats.calc_file_aggregates(df=df, index_value='f1')
+
+    assert aggs[('u', '[m s-1]', 'sonic', 'count')].iloc[0] == 2
+    assert aggs[('u', '[m s-1]', 'sonic', 'mean')].iloc[0] == 2.0
+    assert aggs[('t', '[degC]', 'sonic', 'count')].iloc[0] == 2
+    assert aggs[('t', '[degC]', 'sonic', 'median')].iloc[0] == pytest.approx(20.2)
+    assert list(aggs.columns.get_level_values(0).unique()) == ['t', 'u']  # Sorted
+
+
+def _column_stats_series():
+    # Half-hourly record with a missing day and a gap of a few hours
+    index = pd.date_range('2025-06-01 00:30', '2025-06-05 00:00', freq='30min')
+    index = index[(index.date != pd.Timestamp('2025-06-03').date())
+                  & ~((index >= '2025-06-04 05:00') & (index < '2025-06-04 09:00'))]
+    rng = np.random.default_rng(1)
+    return pd.Series(rng.normal(loc=5, scale=2, size=len(index)), index=index)
+
+
+def test_column_stats_same_as_pandas():
+    """Statistics calculated with np.bincount are the same as with resample, groupby and pivot_table"""
+    y = _column_stats_series()
+    column_stats = stats.ColumnStats(y=y)
+
+    assert column_stats.describe() == pytest.approx(dict(count=y.count(), mean=y.mean(), std=y.std(),
+                                                         min=y.min(), max=y.max()))
+    pd.testing.assert_series_equal(column_stats.quantiles, y.quantile(stats.ColumnStats.QUANTILES))
+    pd.testing.assert_series_equal(column_stats.cumsum, y.cumsum())
+
+    daily = y.resample('D')
+    pd.testing.assert_series_equal(column_stats.daily_mean, daily.mean(), check_freq=False)
+    pd.testing.assert_series_equal(column_stats.daily_std, daily.std(), check_freq=False)
+    assert column_stats.daily_mean.isna().sum() == 1  # Day without data is kept
+
+    hourly = y.groupby(y.index.hour)
+    pd.testing.assert_series_equal(column_stats.hourly_mean, hourly.mean(), check_index_type=False,
+                                   check_names=False)
+    pd.testing.assert_series_equal(column_stats.hourly_std, hourly.std(), check_index_type=False,
+                                   check_names=False)
+
+    df = pd.DataFrame({'value': y.to_numpy(), 'date': y.index.date,
+                       'slot': y.index.hour * 2 + y.index.minute // 30})
+    fingerprint = df.pivot_table(index='date', columns='slot', values='value', aggfunc='mean', dropna=False)
+    pd.testing.assert_frame_equal(column_stats.fingerprint, fingerprint, check_index_type=False,
+                                  check_column_type=False)
+
+
+def test_column_stats_without_data():
+    """Empty series yield NaN statistics and empty tables"""
+    column_stats = stats.ColumnStats(y=pd.Series([], index=pd.DatetimeIndex([]), dtype='float64'))
+
+    assert column_stats.count == 0
+    assert np.isnan(column_stats.mean) and np.isnan(column_stats.std)
+    assert column_stats.quantiles.isna().all()
+    assert column_stats.daily_mean.empty and column_stats.hourly_mean.empty
+    assert column_stats.fingerprint.empty
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from fluxrun.ops import vis
+
+
+def test_decimate_minmax_keeps_extremes_of_each_bucket():
+    index = pd.date_range('2025-06-01', periods=1000, freq='30min')
+    rng = np.random.default_rng(7)
+    y = pd.Series(rng.normal(size=1000), index=index)
+    y.iloc[500] = np.nan  # Gap break
+
+    decimated = vis.decimate_minmax(y=y, num_buckets=10)
+
+    assert len(decimated) <= 2 * 10 + 1
+    assert decimated.index.is_monotonic_increasing
+    assert decimated.isna().sum() == 1
+    bucket = ((index.asi8 - index.asi8[0]) / (index.asi8[-1] - index.asi8[0] + 1) * 10).astype(int)
+    grouped = y.groupby(bucket)
+    assert set(grouped.idxmin()) | set(grouped.idxmax()) <= set(decimated.index)
+    assert decimated.min() == y.min() and decimated.max() == y.max()
+
+
+def test_decimate_minmax_short_series_unchanged():
+    y = pd.Series([1.0, 2.0, 3.0, 4.0], index=pd.date_range('2025-06-01', periods=4, freq='30min'))
+    assert vis.decimate_minmax(y=y, num_buckets=2) is y
+
+
+def test_insert_gap_breaks():
+    index = pd.DatetimeIndex(['2025-06-01 00:00', '2025-06-01 00:30', '2025-06-01 06:30',
+                              '2025-06-01 07:00', '2025-06-02 07:00'])
+    y = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0], index=index, name='fc')
+
+    result = vis.insert_gap_breaks(y=y, min_gap=pd.Timedelta(hours=2))
+
+    assert result.name == 'fc'
+    assert list(result.index) == list(pd.DatetimeIndex([
+        '2025-06-01 00:00', '2025-06-01 00:30', '2025-06-01 03:30', '2025-06-01 06:30',
+        '2025-06-01 07:00', '2025-06-01 19:00', '2025-06-02 07:00']))
+    assert result.isna().tolist() == [False, False, True, False, False, True, False]
+    assert vis.insert_gap_breaks(y=y, min_gap=pd.Timedelta(days=2)) is y